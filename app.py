@@ -0,0 +1,18 @@
+# app.py
+"""Single entry point for the Streamlit pages:
+
+    streamlit run app.py
+
+Pages share one process, so the game library, job queue and model clients in
+app_resources are created once and stay warm while users switch pages.
+"""
+import streamlit as st
+
+st.set_page_config(page_title="hackthon", layout="wide")
+
+page = st.navigation([
+    st.Page("gamemodule/st_game.py", title="Game Generator", icon="🎮", default=True),
+    st.Page("imagemodule/st_storyboard.py", title="Storyboard Images", icon="🖼️"),
+    st.Page("st_main.py", title="Camera", icon="📷"),
+])
+page.run()
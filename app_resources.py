@@ -0,0 +1,41 @@
+# app_resources.py
+"""Objects shared by every page and session of the Streamlit app.
+
+Each is built once per process through st.cache_resource, and each heavy
+import (langchain, vertexai) happens inside the function that needs it, so a
+page only pays for what it actually uses.
+"""
+import streamlit as st
+
+
+@st.cache_resource(show_spinner=False)
+def game_library():
+    from gamemodule.game_library import get_game_library
+
+    return get_game_library()
+
+
+@st.cache_resource(show_spinner=False)
+def job_queue():
+    from gamemodule.job_queue import get_job_queue
+
+    return get_job_queue()
+
+
+@st.cache_resource(show_spinner="Connecting to the model...")
+def chat_client(model_name):
+    """The llm_config client for model_name; worker threads reuse the same instance."""
+    from llm_config import get_client, setup_api_keys
+    from replay_models import replay_enabled
+
+    # get_client would fall back to a terminal prompt, which a server cannot answer.
+    if not replay_enabled() and not setup_api_keys(interactive=False):
+        raise RuntimeError("GOOGLE_API_KEY is not set; add it to hack.env.")
+    return get_client(model_name)
+
+
+@st.cache_resource(show_spinner="Loading the image model...")
+def image_model():
+    from imagemodule.st_image import get_generation_model
+
+    return get_generation_model()
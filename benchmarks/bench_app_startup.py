@@ -0,0 +1,167 @@
+"""Cold start and first-render time of the Streamlit entry points.
+
+Every measurement runs in a fresh interpreter, so imports are cold:
+
+- import: time to import each heavy module on its own
+- standalone: first run of each page script on its own (the old way)
+- app.py: first run of the shell, then the first render of each page
+  switched to in that same process, with shared resources already warm
+
+Needs streamlit. Run from the repository root; --compare REF also measures
+REF (checked out into a temporary git worktree) and prints it alongside, for
+before/after numbers:
+
+    python -m benchmarks.bench_app_startup --compare 2e5b31c^
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = (
+    "llm_config",
+    "gamemodule.game_generator",
+    "gamemodule.job_queue",
+    "imagemodule.st_image",
+    "imagemodule.utility",
+)
+# imagemodule/st_image.py is a script, not a page: run as __main__ it renders a
+# whole storyboard through Imagen.
+PAGES = ("gamemodule/st_game.py", "imagemodule/st_storyboard.py", "st_main.py")
+SHELL = "app.py"
+# Switched to after the shell's default page (st_game) has rendered.
+SHELL_PAGES = ("imagemodule/st_storyboard.py", "st_main.py")
+TIMEOUT = 300
+
+_IMPORT_PROBE = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+_RENDER_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+script, pages = sys.argv[1], sys.argv[2:]
+timings = {}
+start = time.perf_counter()
+at = AppTest.from_file(script, default_timeout=%d).run()
+timings[script] = time.perf_counter() - start
+for page in pages:
+    start = time.perf_counter()
+    at.switch_page(page).run()
+    timings[page] = time.perf_counter() - start
+print(json.dumps({"timings": timings, "errors": [e.value for e in at.exception]}))
+""" % TIMEOUT
+
+
+def _probe(root, code, *args):
+    """Run code in a fresh interpreter in `root`; returns (wall seconds, stdout, error)."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code, *args], cwd=root, capture_output=True, text=True,
+                          timeout=TIMEOUT)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return wall, None, lines[-1] if lines else f"exit code {proc.returncode}"
+    return wall, proc.stdout.strip().splitlines()[-1], None
+
+
+def measure_imports(root=ROOT):
+    results = {}
+    for module in MODULES:
+        wall, out, error = _probe(root, _IMPORT_PROBE, module)
+        results[module] = {"process": wall, "import": float(out) if out else None, "error": error}
+    return results
+
+
+def measure_pages(root=ROOT):
+    results = {}
+    for page in PAGES:
+        if not os.path.exists(os.path.join(root, page)):
+            continue
+        wall, out, error = _probe(root, _RENDER_PROBE, os.path.join(root, page))
+        data = json.loads(out) if out else {"timings": {}, "errors": []}
+        results[page] = {
+            "process": wall,
+            "first_render": next(iter(data["timings"].values()), None),
+            "error": error or "; ".join(data["errors"]) or None,
+        }
+    return results
+
+
+def measure_shell(root=ROOT):
+    if not os.path.exists(os.path.join(root, SHELL)):
+        return None
+    wall, out, error = _probe(root, _RENDER_PROBE, os.path.join(root, SHELL), *SHELL_PAGES)
+    data = json.loads(out) if out else {"timings": {}, "errors": []}
+    timings = data["timings"]
+    return {
+        "process": wall,
+        "first_render": timings.pop(os.path.join(root, SHELL), None),
+        "pages": timings,
+        "error": error or "; ".join(data["errors"]) or None,
+    }
+
+
+def _fmt(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+def measure(root=ROOT):
+    return {"imports": measure_imports(root), "pages": measure_pages(root), "shell": measure_shell(root)}
+
+
+def measure_ref(ref):
+    """measure() on git revision `ref`, checked out into a temporary worktree."""
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "checkout")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, ref], cwd=ROOT, check=True,
+                       capture_output=True)
+        try:
+            return measure(worktree)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, capture_output=True)
+
+
+def _row(label, key, new, old):
+    """One line of output: `key` from the new result and, if comparing, the old one."""
+    line = f"  {label:<32} {key} {_fmt(new and new.get(key)):>8}"
+    if old is not None:
+        line += f"  (before {_fmt(old.get(key)):>8})"
+    error = (new or {}).get("error")
+    return line + (f"  {error}" if error else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start and first-render time of the Streamlit entry points.")
+    parser.add_argument("--compare", metavar="REF", help="git revision to measure as the 'before' numbers")
+    args = parser.parse_args()
+    new = measure()
+    old = measure_ref(args.compare) if args.compare else None
+
+    def before(section, key):
+        return None if old is None else (old[section] or {}).get(key, {})
+
+    print("Cold imports")
+    for module, r in new["imports"].items():
+        print(_row(module, "import", r, before("imports", module)))
+    print("Standalone pages (first render)")
+    for page, r in new["pages"].items():
+        print(_row(page, "first_render", r, before("pages", page)))
+    shell = new["shell"]
+    if shell is not None:
+        print(f"{SHELL} (process {_fmt(shell['process'])})")
+        print(_row(SHELL, "first_render", shell, None if old is None else old["shell"] or {}))
+        for page, seconds in shell["pages"].items():
+            previous = None if old is None else {"render": ((old["shell"] or {}).get("pages") or {}).get(page)}
+            print(_row(page, "render", {"render": seconds}, previous))
+
+
+if __name__ == "__main__":
+    main()
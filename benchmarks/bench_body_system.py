@@ -0,0 +1,73 @@
+"""Frame time of orbit update + rocket collision versus body count.
+
+Compares the original per-sprite loop (math.cos/sin per planet, then a
+Python circle test per planet) with body_system.BodySystem. Needs numpy, not
+pygame. Run from the repository root:
+
+    python -m benchmarks.bench_body_system
+"""
+import math
+import random
+import timeit
+
+from body_system import BodySystem
+
+BODY_COUNTS = (9, 100, 1000, 10000, 100000)
+CENTER = (500, 375)
+ROCKET = (50, 375, 25.0)
+FRAMES = 20
+REPEAT = 5
+
+
+def make_bodies(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "orbit": rng.uniform(40, 450),
+            "speed": rng.uniform(0.0005, 0.01),
+            "radius": rng.uniform(2, 25),
+            "angle": rng.uniform(0, 2 * math.pi),
+        }
+        for _ in range(count)
+    ]
+
+
+def per_sprite_frame(bodies):
+    """What Planet.update plus spritecollide(collide_circle) did for each body."""
+    cx, cy = CENTER
+    x, y, r = ROCKET
+    hits = []
+    for i, body in enumerate(bodies):
+        body["angle"] += body["speed"]
+        bx = int(cx + body["orbit"] * math.cos(body["angle"]))
+        by = int(cy + body["orbit"] * math.sin(body["angle"]))
+        if (bx - x) ** 2 + (by - y) ** 2 <= (body["radius"] + r) ** 2:
+            hits.append(i)
+    return hits
+
+
+def vectorized_frame(system):
+    system.step()
+    return system.collide(*ROCKET)
+
+
+def main():
+    print(f"{'bodies':>8} {'per-sprite':>12} {'vectorized':>12}  (ms per frame, best of {REPEAT})")
+    for count in BODY_COUNTS:
+        bodies = make_bodies(count)
+        system = BodySystem(
+            CENTER,
+            orbit_radius=[b["orbit"] for b in bodies],
+            speed=[b["speed"] for b in bodies],
+            radius=[b["radius"] for b in bodies],
+            angle=[b["angle"] for b in bodies],
+        )
+        timings = [
+            min(timeit.repeat(lambda: fn(arg), number=FRAMES, repeat=REPEAT)) / FRAMES * 1000
+            for fn, arg in ((per_sprite_frame, bodies), (vectorized_frame, system))
+        ]
+        print(f"{count:>8} " + " ".join(f"{t:>12.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Microbenchmark for gamemodule.code_fences on multi-hundred-KB model responses.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_code_fences
+"""
+import glob
+import os
+import timeit
+
+from gamemodule.code_fences import FencedOutputExtractor, remove_code_fences
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gamemodule", "web_game")
+SIZES_KB = (100, 300, 800)
+CHUNK_SIZE = 64  # roughly what a streaming Gemini response delivers per chunk
+REPEAT = 5
+
+
+def legacy_remove_code_fences(text):
+    """The original splitlines-based implementation, kept as the baseline."""
+    lines = text.splitlines()
+    cleaned_lines = []
+
+    inside_code_block = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            inside_code_block = not inside_code_block
+            continue
+        if inside_code_block or stripped:
+            cleaned_lines.append(line)
+
+    return "\n".join(cleaned_lines)
+
+
+def make_response(size_kb):
+    """A prose preamble, a small css block and one large html block of about size_kb."""
+    games = [open(path, encoding="utf-8").read() for path in sorted(glob.glob(os.path.join(GAME_DIR, "*.html")))]
+    body = []
+    total = 0
+    while total < size_kb * 1024:
+        for game in games:
+            body.append(game)
+            total += len(game)
+    return "Here is your game:\n\n```css\nbody { margin: 0; }\n```\n\n```html\n" + "\n".join(body) + "\n```\nHave fun!\n"
+
+
+def feed_in_chunks(text):
+    extractor = FencedOutputExtractor()
+    for i in range(0, len(text), CHUNK_SIZE):
+        extractor.feed(text[i:i + CHUNK_SIZE])
+    return extractor.finish()
+
+
+def main():
+    print(f"{'size':>8} {'legacy':>10} {'whole':>10} {'streamed':>10}  (best of {REPEAT}, ms)")
+    for size_kb in SIZES_KB:
+        text = make_response(size_kb)
+        assert remove_code_fences(text) == feed_in_chunks(text)
+        timings = [
+            min(timeit.repeat(lambda: fn(text), number=1, repeat=REPEAT)) * 1000
+            for fn in (legacy_remove_code_fences, remove_code_fences, feed_in_chunks)
+        ]
+        print(f"{len(text) // 1024:>6}KB " + " ".join(f"{t:>10.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Word wrapping cost for long educational texts in a real pygame font.
+
+Compares the original wrap_text from temp_game.py (font.size on the growing
+line for every word) with text_layout.wrap_text, cold (caches cleared) and
+warm (the same layout requested again, as happens every frame). Needs
+pygame. Run from the repository root:
+
+    python -m benchmarks.bench_text_layout
+"""
+import os
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from text_layout import clear_caches, wrap_text
+
+PARAGRAPH = (
+    "Jupiter is a gas giant with no solid surface to stand on. Its 'surface' is a swirling layer of "
+    "colorful clouds and storms, and the Great Red Spot is a storm wider than the whole Earth that has "
+    "been raging for hundreds of years. Jupiter has at least ninety-five moons; the four largest were "
+    "discovered by Galileo in 1610 and showed that not everything in the sky circles our planet. "
+)
+PARAGRAPHS = (1, 5, 20, 50)
+MAX_WIDTH = 850
+REPEAT = 5
+
+
+def legacy_wrap_text(text, font, max_width):
+    words = text.split(' ')
+    lines = []
+    current_line = ""
+    for word in words:
+        test_line = current_line + word + " "
+        if font.size(test_line)[0] < max_width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word + " "
+    lines.append(current_line)
+    return lines
+
+
+def cold_wrap_text(text, font, max_width):
+    clear_caches()
+    return wrap_text(text, font, max_width)
+
+
+def main():
+    pygame.font.init()
+    font = pygame.font.Font(None, 30)
+    print(f"{'chars':>8} {'lines':>6} {'legacy':>10} {'cold':>10} {'warm':>10}  (best of {REPEAT}, ms)")
+    for count in PARAGRAPHS:
+        text = PARAGRAPH * count
+        lines = wrap_text(text, font, MAX_WIDTH)
+        timings = [
+            min(timeit.repeat(lambda: fn(text, font, MAX_WIDTH), number=1, repeat=REPEAT)) * 1000
+            for fn in (legacy_wrap_text, cold_wrap_text, wrap_text)
+        ]
+        print(f"{len(text):>8} {len(lines):>6} " + " ".join(f"{t:>10.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
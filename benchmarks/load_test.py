@@ -0,0 +1,131 @@
+"""Simulated concurrent users against the generation stack, on replay models.
+
+Each user thread issues a mix of game generations (generate_game_code, cache
+bypassed), quick queries and storyboard scene renders against
+replay_models, then throughput and latency percentiles are reported per
+operation. No keys or network needed. Run from the repository root:
+
+    python -m benchmarks.load_test --users 20 --requests 10 --error-rate 0.05
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+OPERATIONS = ("game", "query", "image")
+TOPICS = ("waste management", "shooting game", "photosynthesis", "fractions", "the water cycle", "volcanoes")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def _make_operations(output_dir):
+    # Imported here so REPLAY_* settings from the command line are in place first.
+    from gamemodule.game_generator import generate_game_code
+    from imagemodule.st_image import GENERATION_SETTINGS, MODEL_NAME, get_generation_model
+    from imagemodule.storyboard import generate_scene
+    from llm_config import llm_config
+
+    def game(rng):
+        if generate_game_code(rng.choice(TOPICS), use_cache=False) is None:
+            raise RuntimeError("no game generated")
+
+    def query(rng):
+        if llm_config.quick_query(f"Give one fun fact about {rng.choice(TOPICS)}.") is None:
+            raise RuntimeError("no answer")
+
+    def image(rng):
+        scene = {"index": rng.randrange(1_000_000), "title": "", "prompt": f"A storybook picture of {rng.choice(TOPICS)}"}
+        generate_scene(get_generation_model(), scene, output_dir, model_name=MODEL_NAME, **GENERATION_SETTINGS)
+
+    return {"game": game, "query": query, "image": image}
+
+
+def run_load(users, requests, mix, output_dir, seed=0):
+    """Run `users` threads of `requests` calls each; returns (samples, wall seconds)."""
+    operations = _make_operations(output_dir)
+    names = [name for name in OPERATIONS if mix.get(name)]
+    weights = [mix[name] for name in names]
+    samples = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(users)
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        barrier.wait()
+        for _ in range(requests):
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                operations[name](rng)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            with lock:
+                samples.append({"op": name, "latency": time.perf_counter() - start, "error": error})
+
+    threads = [threading.Thread(target=user, args=(i,), name=f"user-{i}") for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def report(samples, wall):
+    groups = {"all": samples}
+    for sample in samples:
+        groups.setdefault(sample["op"], []).append(sample)
+    result = {}
+    for name, items in groups.items():
+        ok = [s["latency"] for s in items if s["error"] is None]
+        result[name] = {
+            "requests": len(items),
+            "errors": len(items) - len(ok),
+            "throughput": len(ok) / wall if wall else 0.0,
+            **{f"p{p}": percentile(ok, p) for p in (50, 95, 99)},
+            "max": max(ok) if ok else None,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the generation stack against replay models.")
+    parser.add_argument("-u", "--users", type=int, default=10)
+    parser.add_argument("-n", "--requests", type=int, default=5, help="requests per user")
+    parser.add_argument("--mix", default="game=1,query=3,image=1", help="relative weight per operation")
+    parser.add_argument("--time-scale", type=float, default=None,
+                        help="simulated latency as a fraction of each model's expected latency")
+    parser.add_argument("--error-rate", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ["REPLAY_MODELS"] = "1"
+    if args.time_scale is not None:
+        os.environ["REPLAY_TIME_SCALE"] = str(args.time_scale)
+    if args.error_rate is not None:
+        os.environ["REPLAY_ERROR_RATE"] = str(args.error_rate)
+    os.environ.setdefault("LLM_METRICS_PATH", os.path.join(tempfile.gettempdir(), "replay_llm_calls.jsonl"))
+    mix = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        samples, wall = run_load(args.users, args.requests, mix, output_dir, args.seed)
+
+    def fmt(value):
+        return "-" if value is None else f"{value * 1000:.0f}ms"
+
+    print(f"{args.users} users x {args.requests} requests in {wall:.1f}s")
+    for name, stats in report(samples, wall).items():
+        print(f"  {name:<6} {stats['requests']:>5} req  {stats['errors']:>4} err  {stats['throughput']:>7.2f} req/s  "
+              f"p50 {fmt(stats['p50']):>7}  p95 {fmt(stats['p95']):>7}  p99 {fmt(stats['p99']):>7}  max {fmt(stats['max']):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+
+TWO_PI = 2 * math.pi
+
+
+class BodySystem:
+    """Bodies on circular orbits around one center, stored as NumPy arrays.
+
+    step() advances every orbit with one vectorized cos/sin, and collide()
+    tests a circle against every body at once, so the per-frame cost stays
+    flat in Python whether there are nine planets or thousands of asteroids.
+    """
+
+    def __init__(self, center, orbit_radius, speed, radius, angle=None, seed=None):
+        self.center = center
+        self.orbit_radius = np.asarray(orbit_radius, dtype=np.float64)
+        self.speed = np.asarray(speed, dtype=np.float64)
+        self.radius = np.asarray(radius, dtype=np.float64)
+        if angle is None:
+            angle = np.random.default_rng(seed).uniform(0, TWO_PI, len(self.orbit_radius))
+        self.angle = np.array(angle, dtype=np.float64)
+        self.positions = np.empty((len(self.angle), 2))
+        self._trig = np.empty(len(self.angle))
+        self._update_positions()
+
+    def __len__(self):
+        return len(self.angle)
+
+    def step(self, dt=1.0):
+        self.angle += self.speed * dt
+        # Wrapping keeps float precision over long sessions.
+        np.mod(self.angle, TWO_PI, out=self.angle)
+        self._update_positions()
+
+    def _update_positions(self):
+        cx, cy = self.center
+        np.cos(self.angle, out=self._trig)
+        np.multiply(self.orbit_radius, self._trig, out=self.positions[:, 0])
+        self.positions[:, 0] += cx
+        np.sin(self.angle, out=self._trig)
+        np.multiply(self.orbit_radius, self._trig, out=self.positions[:, 1])
+        self.positions[:, 1] += cy
+
+    def pixel_positions(self):
+        """Positions truncated to whole pixels, as a list of [x, y] for Rect.center."""
+        return self.positions.astype(np.int64).tolist()
+
+    def collide(self, x, y, radius):
+        """Indices of bodies whose circle overlaps the circle at (x, y)."""
+        dx = self.positions[:, 0] - x
+        dy = self.positions[:, 1] - y
+        reach = self.radius + radius
+        return np.flatnonzero(dx * dx + dy * dy <= reach * reach)
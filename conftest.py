@@ -0,0 +1,13 @@
+"""Shared pytest setup: run from the repository root, with every cache and log in a temp dir.
+
+The modules read these paths at import time, so they are set before any test
+module imports them.
+"""
+import os
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="game-tests-")
+os.environ.setdefault("LLM_METRICS_PATH", os.path.join(_scratch, "llm_calls.jsonl"))
+os.environ.setdefault("GAME_CACHE_DIR", os.path.join(_scratch, "game_cache"))
+os.environ.setdefault("GAME_LIBRARY_DB", os.path.join(_scratch, "game_library.sqlite3"))
+os.environ.setdefault("IMAGE_CACHE_DIR", os.path.join(_scratch, "image_cache"))
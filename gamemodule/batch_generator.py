@@ -0,0 +1,178 @@
+# batch_generator.py
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gamemodule.game_generator import (
+    MODEL_NAME,
+    cached_game,
+    game_cache,
+    invoke_game_model,
+    review_game_code,
+)
+from gamemodule.game_library import LIBRARY_DIR, GameLibrary, get_game_library
+from gamemodule.game_prompts import GAME_TYPES, variant_id, variant_slug
+from instrumentation import print_summary
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 2.0
+MAX_BACKOFF = 60.0
+
+_RATE_LIMIT_MARKERS = ("429", "rate limit", "ratelimit", "quota", "resource exhausted", "resourceexhausted")
+_TRANSIENT_MARKERS = ("500", "503", "unavailable", "deadline", "timeout", "timed out")
+
+
+def is_retryable(error):
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _RATE_LIMIT_MARKERS + _TRANSIENT_MARKERS)
+
+
+def load_contexts(path):
+    """One topic per line; blank lines and `#` comments are ignored."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def _generate_one(context, library, retries, backoff, use_cache, refresh, variant):
+    result = {
+        "context": context,
+        "path": None,
+        "latency": 0.0,
+        "attempts": 0,
+        "cached": False,
+        "model": MODEL_NAME,
+        "findings": None,
+        "error": None,
+    }
+    start = time.perf_counter()
+    code = None
+    report = None
+    prompt_variant = variant_id(**variant)
+    if use_cache and not refresh:
+        code = cached_game(context, prompt_variant, "generate_games_batch")
+        result["cached"] = code is not None
+
+    while code is None:
+        result["attempts"] += 1
+        try:
+            code, result["model"] = invoke_game_model(
+                context, entry_point="generate_games_batch", retries=result["attempts"] - 1, **variant
+            )
+        except Exception as e:
+            if result["attempts"] > retries or not is_retryable(e):
+                result["error"] = f"{type(e).__name__}: {e}"
+                break
+            # Exponential backoff with full jitter so parallel workers that hit
+            # the same rate limit don't all come back at the same instant.
+            delay = min(MAX_BACKOFF, backoff * 2 ** (result["attempts"] - 1))
+            time.sleep(random.uniform(0, delay))
+            continue
+        if not code:
+            result["error"] = "model returned no code"
+            break
+        code, report = review_game_code(code)
+        if use_cache:
+            try:
+                game_cache.put(context, prompt_variant, result["model"], code)
+            except OSError as e:
+                print(f"Failed to cache generated game: {e}")
+
+    if code:
+        try:
+            result["path"] = library.save_game(
+                code, context,
+                model=None if result["cached"] else result["model"],
+                latency=None if result["cached"] else time.perf_counter() - start,
+                report=report,
+                variant=variant_slug(**variant),
+                prompt_variant=prompt_variant,
+            )
+            if report is not None:
+                result["findings"] = len(report["findings"])
+        except OSError as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+    result["latency"] = time.perf_counter() - start
+    return result
+
+
+def generate_games_batch(
+    contexts,
+    concurrency=DEFAULT_CONCURRENCY,
+    output_dir=LIBRARY_DIR,
+    retries=DEFAULT_RETRIES,
+    backoff=DEFAULT_BACKOFF,
+    use_cache=True,
+    refresh=False,
+    on_result=None,
+    **variant,
+):
+    """Generate a game per context with at most `concurrency` model calls in flight.
+
+    `contexts` is a list of topics or a path to a topics file. Returns one
+    result dict per context, in input order; a failing item records its error
+    and never aborts the rest of the batch. `on_result` is called as each
+    item finishes, e.g. for progress reporting. Keyword arguments (grade,
+    age, game_type) pick the prompt variant for every topic.
+    """
+    if isinstance(contexts, (str, os.PathLike)):
+        contexts = load_contexts(contexts)
+    if os.path.abspath(output_dir) == os.path.abspath(LIBRARY_DIR):
+        library = get_game_library()
+    else:
+        library = GameLibrary(output_dir)
+
+    def run(context):
+        result = _generate_one(context, library, retries, backoff, use_cache, refresh, variant)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(run, contexts))
+
+
+def print_result(result):
+    status = "cached" if result["cached"] else f"{result['attempts']} attempt(s)"
+    if result["error"]:
+        print(f"FAIL {result['context']!r} after {result['latency']:.1f}s, {status}: {result['error']}")
+    else:
+        print(f"OK   {result['context']!r} in {result['latency']:.1f}s, {status} -> {result['path']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate many HTML games concurrently.")
+    parser.add_argument("topics", nargs="+", help="topics, or a single path to a file with one topic per line")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("-o", "--output-dir", default=LIBRARY_DIR)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--refresh", action="store_true", help="ignore cached games")
+    parser.add_argument("--grade", type=int, default=None, help="school grade the games are pitched at")
+    parser.add_argument("--game-type", choices=sorted(GAME_TYPES), default="any")
+    args = parser.parse_args()
+
+    contexts = args.topics
+    if len(contexts) == 1 and os.path.isfile(contexts[0]):
+        contexts = contexts[0]
+
+    start = time.perf_counter()
+    results = generate_games_batch(
+        contexts,
+        concurrency=args.concurrency,
+        output_dir=args.output_dir,
+        retries=args.retries,
+        refresh=args.refresh,
+        on_result=print_result,
+        grade=args.grade,
+        game_type=args.game_type,
+    )
+    failed = [r for r in results if r["error"]]
+    print(f"\n{len(results) - len(failed)}/{len(results)} games generated in {time.perf_counter() - start:.1f}s")
+    print_summary()
+
+
+if __name__ == "__main__":
+    main()
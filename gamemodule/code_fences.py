@@ -0,0 +1,130 @@
+# code_fences.py
+import re
+
+_FENCE = re.compile(r"^[ ]{0,3}(`{3,}|~{3,})[ \t]*([^`]*?)[ \t]*$")
+# Start of any line that could be a fence; everything between two of these
+# can be copied through in one slice.
+_FENCE_CANDIDATE = re.compile(r"^[ ]{0,3}(?:```|~~~)", re.MULTILINE)
+_HTML_START = re.compile(r"\s*<(!doctype|html|head|body|\w)", re.IGNORECASE)
+
+
+def _is_html(info, text):
+    return info.split()[0].lower() == "html" if info else bool(_HTML_START.match(text))
+
+
+class FencedOutputExtractor:
+    """Single-pass, incremental extractor for code in a model response.
+
+    feed() takes chunks as they stream in and returns the text that can be
+    shown right away; finish() returns the final document. Each input line is
+    looked at once, so the whole response is processed in linear time.
+
+    Responses come in three shapes, told apart by the first non-blank line:
+    raw HTML (starts with "<"; streamed as-is, stray fence lines dropped),
+    fenced blocks (only block contents are streamed), or prose followed by
+    fences (prose is held back and discarded once a fence opens). When there
+    are several blocks, finish() returns the largest html block, falling back
+    to the largest block of any language. Whitespace inside the code, blank
+    lines included, is kept exactly.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._mode = None  # "raw", "fenced" or "prose"; None until the first non-blank line
+        self._fence = None  # (char, length) of the open fence
+        self._info = ""
+        self._block = []
+        self._blocks = []
+        self._outside = []
+
+    def feed(self, chunk):
+        out = []
+        start = 0
+        while True:
+            if not self._pending and (self._fence is not None or self._mode == "raw"):
+                # Fast path: copy every line up to the next possible fence in one go.
+                candidate = _FENCE_CANDIDATE.search(chunk, start)
+                stop = candidate.start() if candidate else chunk.rfind("\n", start) + 1
+                if stop > start:
+                    text = chunk[start:stop]
+                    (self._block if self._fence is not None else self._outside).append(text)
+                    out.append(text)
+                    start = stop
+            newline = chunk.find("\n", start)
+            if newline < 0:
+                break
+            if self._pending:
+                self._pending.append(chunk[start:newline + 1])
+                line = "".join(self._pending)
+                self._pending = []
+            else:
+                line = chunk[start:newline + 1]
+            emitted = self._line(line)
+            if emitted:
+                out.append(emitted)
+            start = newline + 1
+        if start < len(chunk):
+            self._pending.append(chunk[start:])
+        return "".join(out)
+
+    def flush(self):
+        """Process a final line with no trailing newline; returns its streamable text."""
+        if not self._pending:
+            return ""
+        line = "".join(self._pending)
+        self._pending = []
+        return self._line(line)
+
+    def finish(self):
+        """The extracted document once the whole response has been fed."""
+        self.flush()
+        if self._fence is not None:
+            # Unterminated block (truncated response): keep what arrived.
+            self._close_block()
+        if not self._blocks:
+            return "".join(self._outside)
+        html_blocks = [text for info, text in self._blocks if _is_html(info, text)]
+        candidates = html_blocks or [text for _, text in self._blocks]
+        return max(candidates, key=len)
+
+    def _line(self, line):
+        content = line.rstrip("\r\n")
+        fence = _FENCE.match(content) if content.lstrip(" ")[:3] in ("```", "~~~") else None
+
+        if self._fence is not None:
+            char, length = self._fence
+            if fence and fence.group(1)[0] == char and len(fence.group(1)) >= length and not fence.group(2):
+                self._close_block()
+                return ""
+            self._block.append(line)
+            return line
+
+        if fence:
+            if self._mode == "raw":
+                return ""
+            if self._mode != "fenced":
+                # Anything before the first fence was prose, not code.
+                self._outside = []
+            self._mode = "fenced"
+            self._fence = (fence.group(1)[0], len(fence.group(1)))
+            self._info = fence.group(2)
+            return ""
+
+        if self._mode is None and content.strip():
+            self._mode = "raw" if content.lstrip().startswith("<") else "prose"
+        if self._mode == "fenced":
+            return ""
+        self._outside.append(line)
+        return line if self._mode == "raw" else ""
+
+    def _close_block(self):
+        self._blocks.append((self._info, "".join(self._block)))
+        self._fence = None
+        self._info = ""
+        self._block = []
+
+
+def remove_code_fences(text):
+    extractor = FencedOutputExtractor()
+    extractor.feed(text)
+    return extractor.finish()
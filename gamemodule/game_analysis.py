@@ -0,0 +1,321 @@
+# game_analysis.py
+import json
+import os
+import re
+
+# Generated games run on school Chromebooks; anything much bigger than this
+# is almost always duplicated data or leftover scaffolding.
+MAX_GAME_BYTES = 48 * 1024
+
+# Findings at these severities trigger an automatic re-prompt.
+FIXABLE_SEVERITIES = ("error", "warning")
+
+_SCRIPT = re.compile(r"(<script\b[^>]*>)(.*?)(</script\s*>)", re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_VERBATIM = re.compile(r"<(script|pre|textarea)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_FOR_EACH = re.compile(r"\.forEach\s*\(")
+_SPLICE = re.compile(r"\.splice\s*\(")
+_PUSH = re.compile(r"([A-Za-z_$][\w$.]*)\.push\s*\(")
+_DECLARATION = re.compile(r"\b(let|const|var)\s+$")
+_SET_INTERVAL = re.compile(r"\bsetInterval\s*\(")
+_CALL = re.compile(r"(?<![\w$])([A-Za-z_$][\w$]*)\s*\(")
+_KEYWORDS = {"if", "for", "while", "switch", "catch", "function", "return", "typeof", "new"}
+_RAF = re.compile(r"requestAnimationFrame\s*\(\s*([A-Za-z_$][\w$]*)\s*\)")
+_PER_FRAME_COSTLY = {
+    "dom-query-per-frame": re.compile(r"document\.(getElementById|querySelector(All)?|getElementsBy\w+)\s*\("),
+    "image-load-per-frame": re.compile(r"new\s+Image\s*\("),
+    "pixel-readback-per-frame": re.compile(r"\.getImageData\s*\("),
+    "gradient-per-frame": re.compile(r"\.create(Linear|Radial)Gradient\s*\("),
+}
+_SHADOW_BLUR = re.compile(r"\.shadowBlur\s*=\s*([1-9]\d*)")
+
+
+def _line_of(text, index):
+    return text.count("\n", 0, index) + 1
+
+
+def _code_chars(text, start=0):
+    """(index, char) for each character of `text` from `start` outside strings and comments."""
+    i = start
+    quote = None
+    while i < len(text):
+        c = text[i]
+        if quote:
+            if c == "\\":
+                i += 2
+                continue
+            if c == quote:
+                quote = None
+        elif c in "'\"`":
+            quote = c
+        elif text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = len(text) if newline < 0 else newline
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = len(text) if end < 0 else end + 2
+            continue
+        else:
+            yield i, c
+        i += 1
+
+
+def _matching(text, open_index, open_char="(", close_char=")"):
+    """Index of the bracket closing the one at open_index, skipping strings and comments."""
+    depth = 0
+    for i, c in _code_chars(text, open_index):
+        if c == open_char:
+            depth += 1
+        elif c == close_char:
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text)
+
+
+def _arguments(text, open_index):
+    """Source of each argument of the call whose `(` is at open_index."""
+    close = _matching(text, open_index)
+    args, start, depth = [], open_index + 1, 0
+    for i, c in _code_chars(text, open_index + 1):
+        if i >= close:
+            break
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif c == "," and depth == 0:
+            args.append(text[start:i])
+            start = i + 1
+    args.append(text[start:close])
+    return [arg.strip() for arg in args]
+
+
+def _top_level(js, index):
+    """Whether `index` is outside every {...} block, i.e. in the script's global scope."""
+    depth = 0
+    for i, c in _code_chars(js):
+        if i >= index:
+            break
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+    return depth <= 0
+
+
+def _function_body(js, name):
+    """Source of `function name(...) {...}`, `name = (...) => {...}` or a `name(...) {...}` method, if defined."""
+    target = re.escape(name)
+    match = re.search(
+        r"function\s+%s\s*\([^)]*\)\s*{|%s\s*=\s*(?:function\s*)?\([^)]*\)\s*(?:=>\s*)?{|^[ \t]*%s\s*\([^)]*\)\s*{"
+        % (target, target, target),
+        js,
+        re.MULTILINE,
+    )
+    if not match:
+        return None, 0
+    start = match.end() - 1
+    return js[start:_matching(js, start, "{", "}") + 1], start
+
+
+def _frame_spans(js):
+    """(start, end) of each requestAnimationFrame loop body and of the functions it calls directly."""
+    spans = []
+    for loop_name in set(_RAF.findall(js)):
+        body, start = _function_body(js, loop_name)
+        if body is None:
+            continue
+        spans.append((start, start + len(body)))
+        for callee in set(_CALL.findall(body)) - _KEYWORDS - {loop_name}:
+            called, called_start = _function_body(js, callee)
+            if called is not None:
+                spans.append((called_start, called_start + len(called)))
+    return spans
+
+
+def _finding(rule, severity, message, line):
+    return {"rule": rule, "severity": severity, "message": message, "line": line}
+
+
+def _analyze_script(js, offset_line):
+    findings = []
+
+    for_each_spans = []
+    for match in _FOR_EACH.finditer(js):
+        open_index = match.end() - 1
+        for_each_spans.append((open_index, _matching(js, open_index)))
+    for start, end in for_each_spans:
+        body = js[start:end]
+        if _SPLICE.search(body):
+            findings.append(_finding(
+                "splice-in-foreach", "error",
+                "Array.splice inside forEach skips elements and is O(n) per removal; "
+                "filter the array once per frame or iterate backwards with a for loop.",
+                offset_line + _line_of(js, start) - 1,
+            ))
+        if any(s > start and e < end for s, e in for_each_spans):
+            findings.append(_finding(
+                "nested-foreach", "warning",
+                "Nested forEach loops are O(n*m) per frame (typically collision checks); "
+                "use plain for loops with early exits or a spatial grid.",
+                offset_line + _line_of(js, start) - 1,
+            ))
+
+    for match in _SET_INTERVAL.finditer(js):
+        args = _arguments(js, match.end() - 1)
+        if len(args) > 1 and args[1].isdigit() and int(args[1]) <= 50:
+            findings.append(_finding(
+                "setinterval-animation", "warning",
+                "setInterval drives the animation; use requestAnimationFrame so frames "
+                "sync with the display and pause in background tabs.",
+                offset_line + _line_of(js, match.start()) - 1,
+            ))
+
+    frame_spans = _frame_spans(js)
+    pushed = {}
+    for match in _PUSH.finditer(js):
+        pushed.setdefault(match.group(1), []).append(match.start())
+    for name, indexes in pushed.items():
+        target = re.escape(name)
+        trimmed = re.search(r"%s\.((splice|shift|pop|filter)\s*\(|length\s*=(?!=))" % target, js)
+        # Plain assignments, not comparisons or arrow parameters. The one that
+        # declares the array doesn't bound it: that is a `let`/`const`/`var`
+        # line, or else the first assignment (e.g. `this.items = []`).
+        assignments = [m.start() for m in re.finditer(r"(?<![\w$.])%s\s*=(?![=>])" % target, js)]
+        declarations = [start for start in assignments if _DECLARATION.search(js, 0, start)]
+        reassigned = len(assignments) - len(declarations)
+        if trimmed or reassigned > (0 if declarations else 1):
+            continue
+        # Only an array that lives as long as the game (global, or a property
+        # of an object) and grows every frame is worth a re-prompt; a local
+        # list rebuilt on each call, like a quiz's answer options, is not.
+        lives_on = name.startswith(("this.", "window.")) or (
+            "." not in name and any(_top_level(js, start) for start in declarations)
+        )
+        per_frame = [i for i in indexes if any(start <= i < end for start, end in frame_spans)]
+        findings.append(_finding(
+            "unbounded-array", "warning" if lives_on and per_frame else "info",
+            f"`{name}` is appended to but never trimmed; cap its length or remove dead entries.",
+            offset_line + _line_of(js, (per_frame or indexes)[0]) - 1,
+        ))
+
+    for loop_name in set(_RAF.findall(js)):
+        body, start = _function_body(js, loop_name)
+        if body is None:
+            continue
+        for rule, pattern in _PER_FRAME_COSTLY.items():
+            match = pattern.search(body)
+            if match:
+                findings.append(_finding(
+                    rule, "warning",
+                    f"`{match.group(0).strip('(').strip()}` runs every frame in `{loop_name}`; hoist it out of the loop.",
+                    offset_line + _line_of(js, start + match.start()) - 1,
+                ))
+
+    for match in _SHADOW_BLUR.finditer(js):
+        findings.append(_finding(
+            "shadow-blur", "info",
+            "shadowBlur is very slow on integrated GPUs; prefer pre-rendered glows.",
+            offset_line + _line_of(js, match.start()) - 1,
+        ))
+    return findings
+
+
+def analyze_game(code, max_bytes=MAX_GAME_BYTES):
+    """Static checks for known frame-rate killers plus the byte budget.
+
+    Returns {"bytes", "max_bytes", "findings"}; each finding has a rule,
+    severity, message and 1-based line number in `code`.
+    """
+    findings = []
+    for match in _SCRIPT.finditer(code):
+        findings.extend(_analyze_script(match.group(2), _line_of(code, match.start(2))))
+    size = len(code.encode("utf-8"))
+    if size > max_bytes:
+        findings.append(_finding(
+            "byte-budget", "error", f"Game is {size} bytes, over the {max_bytes} byte budget.", 1,
+        ))
+    if "<canvas" not in code.lower():
+        findings.append(_finding("no-canvas", "error", "No <canvas> element found.", 1))
+    findings.sort(key=lambda f: f["line"])
+    return {"bytes": size, "max_bytes": max_bytes, "findings": findings}
+
+
+def needs_fix(report):
+    return any(f["severity"] in FIXABLE_SEVERITIES for f in report["findings"])
+
+
+def severity_score(report):
+    weights = {"error": 10, "warning": 3, "info": 0}
+    return sum(weights.get(f["severity"], 0) for f in report["findings"])
+
+
+def _verbatim_spans(code):
+    return [m.span() for m in _VERBATIM.finditer(code)]
+
+
+def minify_html(code, strip_indent=False):
+    """Conservative minifier: HTML comments, trailing spaces and blank lines only.
+
+    Lines inside <script>, <pre> and <textarea> are left exactly as they are,
+    since their whitespace (string and template literals, preformatted text)
+    can be content. Indentation elsewhere is stripped only when asked.
+    """
+    spans = _verbatim_spans(code)
+    parts, last = [], 0
+    for start, end in spans:
+        parts.append(_HTML_COMMENT.sub("", code[last:start]))
+        parts.append(code[start:end])
+        last = end
+    parts.append(_HTML_COMMENT.sub("", code[last:]))
+    code = "".join(parts)
+
+    spans = _verbatim_spans(code)
+    out = []
+    pos = 0
+    span = 0
+    for line in code.split("\n"):
+        start, end = pos, pos + len(line)
+        pos = end + 1
+        while span < len(spans) and spans[span][1] <= start:
+            span += 1
+        if span < len(spans) and spans[span][0] <= max(start, end - 1) and start < spans[span][1]:
+            out.append(line)
+            continue
+        line = line.rstrip()
+        if not line:
+            continue
+        out.append(line.lstrip() if strip_indent else line)
+    return "\n".join(out) + ("\n" if code.endswith("\n") else "")
+
+
+def build_fix_prompt(code, report):
+    issues = "\n".join(
+        f"- line {f['line']} [{f['rule']}]: {f['message']}"
+        for f in report["findings"] if f["severity"] in FIXABLE_SEVERITIES
+    )
+    return f"""
+The following HTML5 Canvas educational game has performance problems that make it stutter on low-end school laptops.
+
+Problems found:
+{issues}
+
+Fix every problem listed while keeping the gameplay, visuals and text the same. Keep the file under {report['max_bytes']} bytes.
+Return the complete corrected HTML file as plain text — no markdown, no triple backticks, no explanations.
+
+{code}
+"""
+
+
+def report_path(game_path):
+    root, _ = os.path.splitext(game_path)
+    return root + ".analysis.json"
+
+
+def write_report(game_path, report):
+    path = report_path(game_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
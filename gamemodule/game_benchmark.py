@@ -0,0 +1,236 @@
+# game_benchmark.py
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import time
+
+from gamemodule.game_cache import WEB_GAME_DIR
+
+DEFAULT_SECONDS = 10
+VIEWPORT = {"width": 1280, "height": 800}
+REPORT_PATH = os.path.join(os.path.dirname(__file__), "benchmark_report.json")
+# A game "holds 60 fps" if 95% of its frames come in under this.
+P95_FRAME_BUDGET_MS = 1000 / 55
+
+# Installed before any game script runs. Wraps requestAnimationFrame to time
+# each frame callback, watches for long tasks, and snapshots heap size and
+# the length of every global array (entity lists) so growth can be measured.
+_PROBE_SCRIPT = """
+(() => {
+  const probe = window.__probe = {frames: [], callbackMs: [], longTasks: [], samples: []};
+  const raf = window.requestAnimationFrame.bind(window);
+  let last = null;
+  window.requestAnimationFrame = (cb) => raf((ts) => {
+    if (last !== null) probe.frames.push(ts - last);
+    last = ts;
+    const start = performance.now();
+    try { cb(ts); } finally { probe.callbackMs.push(performance.now() - start); }
+  });
+  try {
+    new PerformanceObserver((list) => {
+      for (const entry of list.getEntries()) probe.longTasks.push(entry.duration);
+    }).observe({type: 'longtask', buffered: true});
+  } catch (e) {}
+  probe.sample = () => {
+    const arrays = {};
+    for (const key of Object.keys(window)) {
+      let value;
+      try { value = window[key]; } catch (e) { continue; }
+      if (Array.isArray(value)) arrays[key] = value.length;
+    }
+    const heap = performance.memory ? performance.memory.usedJSHeapSize : null;
+    probe.samples.push({t: performance.now(), heap, arrays});
+  };
+})();
+"""
+
+# Top-level `let`/`const` bindings are not window properties, so the probe
+# cannot see them; this evaluates their lengths in the page's global scope.
+_LEXICAL_ARRAYS_SCRIPT = """
+(names) => {
+  const out = {};
+  for (const name of names) {
+    try { const v = (0, eval)(name); if (Array.isArray(v)) out[name] = v.length; } catch (e) {}
+  }
+  return out;
+}
+"""
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _top_level_names(code):
+    return sorted(set(re.findall(r"^\s*(?:let|const|var)\s+([A-Za-z_$][\w$]*)\s*=\s*\[", code, re.MULTILINE)))
+
+
+def _drive_input(page, seconds, sample_every=0.5):
+    """Synthetic play: sweep the mouse, click, and tap arrow keys and space."""
+    canvas = page.query_selector("canvas")
+    box = canvas.bounding_box() if canvas else None
+    if not box:
+        box = {"x": 0, "y": 0, "width": VIEWPORT["width"], "height": VIEWPORT["height"]}
+    # Many generated games open with a start button or "click to start" overlay.
+    for button in page.query_selector_all("button"):
+        try:
+            button.click(timeout=200)
+        except Exception:
+            pass
+    keys = ["ArrowLeft", "ArrowRight", "ArrowUp", "ArrowDown", "Space"]
+    deadline = time.monotonic() + seconds
+    next_sample = 0.0
+    step = 0
+    while time.monotonic() < deadline:
+        x = box["x"] + box["width"] * ((step * 37) % 100) / 100
+        y = box["y"] + box["height"] * ((step * 61) % 100) / 100
+        page.mouse.move(x, y)
+        if step % 3 == 0:
+            page.mouse.click(x, y)
+        page.keyboard.press(keys[step % len(keys)])
+        if time.monotonic() >= next_sample:
+            page.evaluate("window.__probe.sample()")
+            next_sample = time.monotonic() + sample_every
+        step += 1
+        page.wait_for_timeout(50)
+    page.evaluate("window.__probe.sample()")
+
+
+def benchmark_game(browser, path, seconds=DEFAULT_SECONDS):
+    """Play one saved game headlessly for `seconds` and summarise its frame times."""
+    with open(path, "r", encoding="utf-8") as f:
+        code = f.read()
+    lexical_names = _top_level_names(code)
+    context = browser.new_context(viewport=VIEWPORT)
+    page = context.new_page()
+    page.add_init_script(_PROBE_SCRIPT)
+    errors = []
+    page.on("pageerror", lambda e: errors.append(str(e)))
+    try:
+        page.goto("file://" + os.path.abspath(path))
+        page.wait_for_timeout(500)
+        first_arrays = page.evaluate(_LEXICAL_ARRAYS_SCRIPT, lexical_names)
+        _drive_input(page, seconds)
+        last_arrays = page.evaluate(_LEXICAL_ARRAYS_SCRIPT, lexical_names)
+        probe = page.evaluate("window.__probe")
+    finally:
+        context.close()
+
+    frames = probe["frames"]
+    samples = probe["samples"]
+    heaps = [s["heap"] for s in samples if s["heap"] is not None]
+    start_arrays = dict(samples[0]["arrays"], **first_arrays) if samples else first_arrays
+    end_arrays = dict(samples[-1]["arrays"], **last_arrays) if samples else last_arrays
+    array_growth = {
+        name: end_arrays[name] - start_arrays.get(name, 0)
+        for name in end_arrays if end_arrays[name] != start_arrays.get(name, 0)
+    }
+    return {
+        "game": os.path.basename(path),
+        "seconds": seconds,
+        "frames": len(frames),
+        "fps": round(1000 / statistics.mean(frames), 1) if frames else 0.0,
+        "frame_ms": {p: percentile(frames, p) for p in (50, 95, 99)},
+        "callback_ms": {p: percentile(probe["callbackMs"], p) for p in (50, 95, 99)},
+        "long_tasks": len(probe["longTasks"]),
+        "long_task_ms": round(sum(probe["longTasks"]), 1),
+        "heap_growth_bytes": heaps[-1] - heaps[0] if len(heaps) >= 2 else None,
+        "array_growth": array_growth,
+        "errors": errors,
+    }
+
+
+def _game_models(paths):
+    """Model per game from the library index, when it has one."""
+    try:
+        from gamemodule.game_library import get_game_library
+
+        library = get_game_library()
+    except Exception:
+        return {}
+    models = {}
+    for row in library.prefix_search("", limit=100000):
+        models[os.path.abspath(row["path"])] = row["model"]
+    return {path: models.get(os.path.abspath(path)) for path in paths}
+
+
+def meets_frame_budget(result, p95_budget_ms=P95_FRAME_BUDGET_MS):
+    """Gate for generated games: animated, error-free, and p95 frame time within budget."""
+    p95 = result["frame_ms"][95]
+    return p95 is not None and p95 <= p95_budget_ms and not result["errors"]
+
+
+def summarize_by_model(results):
+    by_model = {}
+    for result in results:
+        by_model.setdefault(result.get("model") or "unknown", []).append(result)
+    return {
+        model: {
+            "games": len(items),
+            "median_p95_frame_ms": statistics.median(r["frame_ms"][95] for r in items if r["frame_ms"][95] is not None)
+            if any(r["frame_ms"][95] is not None for r in items) else None,
+            "games_holding_60fps": sum(1 for r in items if meets_frame_budget(r)),
+        }
+        for model, items in by_model.items()
+    }
+
+
+def run_benchmarks(paths, seconds=DEFAULT_SECONDS, headless=True):
+    """Benchmark every game in `paths` in one headless Chromium (needs playwright)."""
+    from playwright.sync_api import sync_playwright
+
+    models = _game_models(paths)
+    results = []
+    with sync_playwright() as p:
+        # Precise memory info and no background throttling make runs comparable.
+        browser = p.chromium.launch(
+            headless=headless,
+            args=["--enable-precise-memory-info", "--disable-background-timer-throttling"],
+        )
+        try:
+            for path in paths:
+                result = benchmark_game(browser, path, seconds)
+                result["model"] = models.get(path)
+                results.append(result)
+                print_result(result)
+        finally:
+            browser.close()
+    return {"generated_at": time.time(), "games": results, "by_model": summarize_by_model(results)}
+
+
+def print_result(result):
+    frame = result["frame_ms"]
+
+    def fmt(value):
+        return "-" if value is None else f"{value:.1f}"
+
+    print(
+        f"{result['game']:<60} fps {result['fps']:>5}  p50 {fmt(frame[50])}ms  p95 {fmt(frame[95])}ms  "
+        f"p99 {fmt(frame[99])}ms  long tasks {result['long_tasks']}  arrays {result['array_growth'] or '-'}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure frame times of saved HTML games in headless Chromium.")
+    parser.add_argument("games", nargs="*", help="HTML files (default: every game in web_game/)")
+    parser.add_argument("-s", "--seconds", type=float, default=DEFAULT_SECONDS)
+    parser.add_argument("-o", "--output", default=REPORT_PATH)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    paths = args.games or sorted(glob.glob(os.path.join(WEB_GAME_DIR, "*.html")))
+    report = run_benchmarks(paths, args.seconds, headless=not args.headed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
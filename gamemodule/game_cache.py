@@ -0,0 +1,164 @@
+# game_cache.py
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from replay_models import data_path
+
+CACHE_DIR = os.environ.get(
+    "GAME_CACHE_DIR", data_path(os.path.join(os.path.dirname(__file__), ".game_cache"), "game_cache")
+)
+WEB_GAME_DIR = os.path.join(os.path.dirname(__file__), "web_game")
+
+# Eviction limits: oldest entries go first once the cache grows past
+# MAX_BYTES, and anything older than MAX_AGE_SECONDS is never served.
+MAX_BYTES = 200 * 1024 * 1024
+MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+
+def normalize_context(context):
+    """Collapse case, punctuation and whitespace so equivalent topics share a key."""
+    context = context.replace("_", " ").lower()
+    context = re.sub(r"[^\w\s]", " ", context)
+    return " ".join(context.split())
+
+
+def cache_key(context, prompt_version, model_name):
+    payload = "\x1f".join([normalize_context(context), str(prompt_version), model_name])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def content_hash(code):
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def context_from_filename(filename):
+    """Recover the topic from a `<topic>_game.html` name written by st_game.py."""
+    stem = os.path.basename(filename)
+    if stem.endswith(".html"):
+        stem = stem[: -len(".html")]
+    if stem.endswith("_game"):
+        stem = stem[: -len("_game")]
+    return stem.replace("_", " ")
+
+
+class GameCache:
+    """Content-addressed on-disk cache of generated game HTML.
+
+    Each entry is `<key>.html` plus a `<key>.json` sidecar with the topic,
+    model and prompt version that produced it. File mtimes double as the
+    LRU clock: a hit touches the entry, eviction removes the stalest first.
+    Expiry is measured from the sidecar's `created_at`, so hits don't extend it.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, max_age=MAX_AGE_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".html", base + ".json"
+
+    @staticmethod
+    def _created_at(meta_path):
+        """`created_at` from an entry's sidecar."""
+        with open(meta_path, "r", encoding="utf-8") as f:
+            try:
+                return float(json.load(f)["created_at"])
+            except (ValueError, KeyError, TypeError) as e:
+                raise OSError(f"Corrupt cache metadata {meta_path}: {e}")
+
+    def get(self, context, prompt_version, model_name):
+        html_path, meta_path = self._paths(cache_key(context, prompt_version, model_name))
+        try:
+            age = time.time() - self._created_at(meta_path)
+            if self.max_age is not None and age > self.max_age:
+                self._remove(html_path, meta_path)
+                return None
+            with open(html_path, "r", encoding="utf-8") as f:
+                code = f.read()
+        except OSError:
+            return None
+        now = time.time()
+        for path in (html_path, meta_path):
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return code
+
+    def put(self, context, prompt_version, model_name, code, source="model"):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        html_path, meta_path = self._paths(cache_key(context, prompt_version, model_name))
+        meta = {
+            "context": normalize_context(context),
+            "prompt_version": prompt_version,
+            "model": model_name,
+            "source": source,
+            "size": len(code.encode("utf-8")),
+            "created_at": time.time(),
+        }
+        with self._lock:
+            atomic_write(html_path, code)
+            atomic_write(meta_path, json.dumps(meta))
+            self.evict()
+
+    def invalidate(self, context, prompt_version, model_name):
+        with self._lock:
+            self._remove(*self._paths(cache_key(context, prompt_version, model_name)))
+
+    def evict(self):
+        """Drop expired entries, then the least recently used until under budget."""
+        entries = []
+        now = time.time()
+        for meta_path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            html_path = meta_path[: -len(".json")] + ".html"
+            try:
+                mtime = os.path.getmtime(meta_path)
+                size = os.path.getsize(html_path) + os.path.getsize(meta_path)
+                created_at = self._created_at(meta_path)
+            except OSError:
+                self._remove(html_path, meta_path)
+                continue
+            if self.max_age is not None and now - created_at > self.max_age:
+                self._remove(html_path, meta_path)
+                continue
+            entries.append((mtime, size, html_path, meta_path))
+
+        total = sum(size for _, size, _, _ in entries)
+        if self.max_bytes is None or total <= self.max_bytes:
+            return
+        for _, size, html_path, meta_path in sorted(entries):
+            self._remove(html_path, meta_path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def atomic_write(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,140 @@
+# game_editor.py
+import re
+import time
+
+from gamemodule.game_analysis import FIXABLE_SEVERITIES, analyze_game
+from gamemodule.game_generator import GAME_TIER
+from llm_config import llm_config
+
+# How many times a patch that fails to apply or validate is sent back, with
+# the reason, before giving up.
+MAX_EDIT_RETRIES = 1
+
+_BLOCK = re.compile(
+    r"^<{5,9} SEARCH[ \t]*\r?\n(.*?)^={5,9}[ \t]*\r?\n(.*?)^>{5,9} REPLACE[ \t]*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+
+class PatchError(ValueError):
+    """A model's patch could not be applied to, or broke, the game."""
+
+
+def build_edit_prompt(code, change, error=None):
+    retry = "" if error is None else f"""
+Your previous reply could not be used: {error}
+Reply again with blocks that match the file below exactly.
+"""
+    return f"""
+Change the following HTML5 Canvas educational game as requested, without rewriting it.
+
+Requested change: {change}
+{retry}
+Reply only with SEARCH/REPLACE blocks, no explanations:
+
+<<<<<<< SEARCH
+lines copied exactly from the file, enough to be unique
+=======
+the new lines
+>>>>>>> REPLACE
+
+Use one block per place that changes and keep each block small. To insert
+lines, put the neighbouring existing lines in SEARCH and repeat them in
+REPLACE together with the new ones. Keep everything not mentioned in the
+request the same.
+
+{code}
+"""
+
+
+def parse_edit_blocks(text):
+    """[(search, replace), ...] from a model reply; fences and prose around the blocks are ignored."""
+    return [(search, replace) for search, replace in _BLOCK.findall(text)]
+
+
+def _find_loose(code, search):
+    """(start, end) of `search` in `code` ignoring per-line indentation and trailing spaces, or None."""
+    wanted = [line.strip() for line in search.splitlines()]
+    while wanted and not wanted[-1]:
+        wanted.pop()
+    if not wanted:
+        return None
+    lines = code.splitlines(keepends=True)
+    stripped = [line.strip() for line in lines]
+    matches = [i for i in range(len(lines) - len(wanted) + 1) if stripped[i:i + len(wanted)] == wanted]
+    if len(matches) != 1:
+        return None
+    start = sum(len(line) for line in lines[:matches[0]])
+    return start, start + sum(len(line) for line in lines[matches[0]:matches[0] + len(wanted)])
+
+
+def apply_edit_blocks(code, blocks):
+    """Apply SEARCH/REPLACE blocks in order. Each SEARCH must match exactly once."""
+    if not blocks:
+        raise PatchError("no SEARCH/REPLACE blocks found")
+    for n, (search, replace) in enumerate(blocks, 1):
+        count = code.count(search) if search else 0
+        if count == 1:
+            start = code.index(search)
+            end = start + len(search)
+        elif count > 1:
+            raise PatchError(f"block {n}: SEARCH text occurs {count} times; include more surrounding lines")
+        else:
+            span = _find_loose(code, search)
+            if span is None:
+                raise PatchError(f"block {n}: SEARCH text not found in the file")
+            start, end = span
+        code = code[:start] + replace + code[end:]
+    return code
+
+
+def validate_edit(old_code, new_code, old_report=None):
+    """Problems the edit introduced, as strings; empty if the new game looks sound."""
+    problems = []
+    if not new_code.strip():
+        return ["the edited file is empty"]
+    lower_old, lower_new = old_code.lower(), new_code.lower()
+    for tag in ("</html>", "</script>", "<canvas"):
+        if tag in lower_old and tag not in lower_new:
+            problems.append(f"the edit removed {tag}")
+    if lower_new.count("<script") != lower_new.count("</script"):
+        problems.append("unbalanced <script> tags")
+    old_report = old_report or analyze_game(old_code)
+    new_report = analyze_game(new_code)
+    known = {f["rule"] for f in old_report["findings"]}
+    for f in new_report["findings"]:
+        if f["severity"] in FIXABLE_SEVERITIES and f["rule"] not in known:
+            problems.append(f"line {f['line']} [{f['rule']}]: {f['message']}")
+    return problems
+
+
+def edit_game_code(code, change, max_retries=MAX_EDIT_RETRIES):
+    """Apply `change` to an existing game through a patch instead of a full regeneration.
+
+    Returns a dict with the new code, its analysis report, the model that
+    wrote the patch, the applied blocks and the total latency. Raises
+    PatchError if no usable patch arrives; model errors propagate.
+    """
+    start = time.perf_counter()
+    old_report = analyze_game(code)
+    error = None
+    for attempt in range(max_retries + 1):
+        message, model_name = llm_config.invoke(build_edit_prompt(code, change, error), tier=GAME_TIER,
+                                                entry_point="edit_game_code", retries=attempt)
+        blocks = parse_edit_blocks(message.content)
+        try:
+            new_code = apply_edit_blocks(code, blocks)
+            problems = validate_edit(code, new_code, old_report)
+            if problems:
+                raise PatchError("; ".join(problems))
+        except PatchError as e:
+            error = str(e)
+            continue
+        return {
+            "code": new_code,
+            "report": analyze_game(new_code),
+            "model": model_name,
+            "blocks": blocks,
+            "latency": time.perf_counter() - start,
+        }
+    raise PatchError(error)
@@ -1,58 +1,169 @@
 # game_generator.py
-import pygame  # Needed only if used inside generated code
-import random
-import getpass
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
-
-def remove_code_fences(text):
-    lines = text.splitlines()
-    cleaned_lines = []
-
-    inside_code_block = False
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("```"):
-            inside_code_block = not inside_code_block
-            continue
-        if inside_code_block or stripped:
-            cleaned_lines.append(line)
-
-    return "\n".join(cleaned_lines)
-
-load_dotenv('hack.env')
-
-if not os.environ.get("GOOGLE_API_KEY"):
-    os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter API key for Google Gemini: ")
-
-try:
-    model = init_chat_model("gemini-2.5-pro", model_provider="google_genai")
-except Exception as e:
-    print(f"Failed to initialize the chat model: {e}")
-    exit()
-def  generate_game_code(context):
-    prompt = f"""
-You are a JavaScript game developer creating simple 2D educational games for children using **HTML5 Canvas** and **vanilla JavaScript** (no external libraries like Phaser.js or p5.js).
-
-Generate a complete **HTML file** with embedded JavaScript that teaches the topic: **"{context}"** in a fun, interactive, and age-appropriate way for a 5th-grade student (around 10–11 years old).
-
-Requirements:
-1. The code must be a single, complete **HTML file**.
-2. Include **Canvas-based visuals**, animations, and interactivity.
-3. The game must be **educational** and reflect the topic "{context}" — e.g., clickable sorting items, correct/incorrect scoring, movement, or decision making.
-4. Add clear instructions, simple score tracking, and gradually increasing difficulty (if possible).
-5. Use bright colors, simple shapes, or sprite-like drawings with HTML5 Canvas only.
-6. Return the code as plain text — no markdown or triple backticks.
-
-Example Topics: Waste Management (separating items), Nutrition (classifying food), Energy Types (match renewable sources), etc.
-
-Generate only the HTML code as plain text — no explanations.
-"""
+from gamemodule.game_analysis import (
+    analyze_game,
+    build_fix_prompt,
+    minify_html,
+    needs_fix,
+    severity_score,
+)
+from gamemodule.game_cache import GameCache
+from gamemodule.code_fences import FencedOutputExtractor, remove_code_fences
+from gamemodule.game_prompts import compile_prompt, variant_id
+from instrumentation import record_cache_hit, record_call
+from llm_config import llm_config
+
+MODEL_NAME = "gemini-2.5-pro"
+# Games need the top quality tier; llm_config routes to MODEL_NAME unless it
+# is failing, in which case results are cached under the model that served them.
+GAME_TIER = "pro"
+# Games are cached per prompt variant (see game_prompts.variant_id); bump
+# TEMPLATE_VERSION there whenever the prompt, fence extraction or review stage
+# changes so stale cached games are not served.
+
+# How many times a game flagged by game_analysis is sent back for a fix.
+MAX_FIX_ROUNDS = 1
+
+game_cache = GameCache()
+
+
+def routed_model_name():
+    return llm_config.route(GAME_TIER)[0]
+
+
+def cached_game(context, prompt_variant, entry_point):
+    """Cached HTML for (context, variant) under MODEL_NAME, recording the hit, or None."""
+    code = game_cache.get(context, prompt_variant, MODEL_NAME)
+    if code is not None:
+        record_cache_hit(entry_point, MODEL_NAME, variant=prompt_variant)
+    return code
+
+
+def invoke_game_model(context, entry_point="generate_game_code", retries=0, **variant):
+    """Single uncached model call returning (code, model_name).
+
+    Exceptions propagate so callers can retry; `retries` is how many attempts
+    came before this one, for the metrics log. Keyword arguments (grade, age,
+    game_type) pick the prompt variant.
+    """
+    prompt_variant, messages = compile_prompt(context, **variant)
+    s, model_name = llm_config.invoke(messages, tier=GAME_TIER, entry_point=entry_point,
+                                      retries=retries, variant=prompt_variant)
+    return remove_code_fences(s.content), model_name
+
+
+def review_game_code(code, max_fix_rounds=MAX_FIX_ROUNDS):
+    """Post-generation stage: analyze, re-prompt flagged games, then minify.
+
+    A fix is only kept if it scores better than what it replaces. Returns
+    (code, report) where report describes the final code.
+    """
+    report = analyze_game(code)
+    fix_rounds = 0
+    for _ in range(max_fix_rounds):
+        if not needs_fix(report):
+            break
+        fix_rounds += 1
+        try:
+            s, _ = llm_config.invoke(build_fix_prompt(code, report), tier=GAME_TIER,
+                                     entry_point="review_game_code")
+        except Exception as e:
+            print(f"An error occurred while asking the model for a fix: {e}")
+            break
+        fixed = remove_code_fences(s.content)
+        fixed_report = analyze_game(fixed)
+        if not fixed or severity_score(fixed_report) >= severity_score(report):
+            break
+        code, report = fixed, fixed_report
+    over_budget = report["bytes"] > report["max_bytes"]
+    code = minify_html(code, strip_indent=over_budget)
+    report = analyze_game(code)
+    report["fix_rounds"] = fix_rounds
+    return code, report
+
+
+def generate_game_code(context, use_cache=True, refresh=False, **variant):
+    """Return HTML for `context`, serving repeat topics from the on-disk cache.
+
+    use_cache=False bypasses the cache entirely; refresh=True skips the lookup
+    but stores the fresh result, replacing whatever was cached. Keyword
+    arguments (grade, age, game_type) pick the prompt variant.
+    """
+    prompt_variant = variant_id(**variant)
+    if use_cache and not refresh:
+        cached = cached_game(context, prompt_variant, "generate_game_code")
+        if cached is not None:
+            return cached
+
     try:
-        s = model.invoke(prompt)
-        return remove_code_fences(s.content)
+        code, model_name = invoke_game_model(context, **variant)
     except Exception as e:
         print(f"An error occurred while invoking the model: {e}")
         return None
+    if not code:
+        return None
+    code, _ = review_game_code(code)
+    if use_cache:
+        try:
+            game_cache.put(context, prompt_variant, model_name, code)
+        except OSError as e:
+            print(f"Failed to cache generated game: {e}")
+    return code
+
+
+class stream_game_code:
+    """Iterate to receive the game HTML in chunks as the model produces them.
+
+    Fences are stripped on the fly, so each chunk can be appended straight to
+    a preview. A cache hit arrives as a single chunk. Once iteration ends,
+    `code` holds the reviewed (possibly fixed and minified) game, `report`
+    its analysis and `model_name` the model that wrote it; `code` stays None
+    if the stream failed, with the error printed. Keyword arguments (grade,
+    age, game_type) pick the prompt variant.
+    """
+
+    def __init__(self, context, use_cache=True, refresh=False, **variant):
+        self.context = context
+        self.use_cache = use_cache
+        self.refresh = refresh
+        self.variant = variant
+        self.prompt_variant = variant_id(**variant)
+        self.code = None
+        self.report = None
+        self.model_name = MODEL_NAME
+        self.cached = False
+
+    def __iter__(self):
+        if self.use_cache and not self.refresh:
+            cached = cached_game(self.context, self.prompt_variant, "stream_game_code")
+            if cached is not None:
+                self.code, self.report, self.cached = cached, analyze_game(cached), True
+                yield cached
+                return
 
+        extractor = FencedOutputExtractor()
+        self.model_name = routed_model_name()
+        _, messages = compile_prompt(self.context, **self.variant)
+        try:
+            with record_call("stream_game_code", self.model_name, variant=self.prompt_variant) as call:
+                for message_chunk in llm_config.get_model(self.model_name).stream(messages):
+                    call.first_token()
+                    call.add_usage(message_chunk)
+                    text = extractor.feed(message_chunk.content)
+                    if text:
+                        yield text
+                text = extractor.flush()
+                if text:
+                    yield text
+        except Exception as e:
+            llm_config.record_error(self.model_name, e)
+            print(f"An error occurred while streaming from the model: {e}")
+            return
+        code = extractor.finish()
+        if not code.strip():
+            return
+        self.code, self.report = review_game_code(code)
+        if self.use_cache:
+            try:
+                game_cache.put(self.context, self.prompt_variant, self.model_name, self.code)
+            except OSError as e:
+                print(f"Failed to cache generated game: {e}")
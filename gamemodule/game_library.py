@@ -0,0 +1,357 @@
+# game_library.py
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from gamemodule.game_cache import (
+    WEB_GAME_DIR,
+    atomic_write,
+    content_hash,
+    context_from_filename,
+    normalize_context,
+)
+from gamemodule.game_analysis import report_path, write_report
+from replay_models import data_path
+
+# Where saved games live; replay runs (see replay_models) keep theirs apart.
+LIBRARY_DIR = data_path(WEB_GAME_DIR, "web_game")
+LIBRARY_DB = os.environ.get(
+    "GAME_LIBRARY_DB",
+    data_path(os.path.join(os.path.dirname(__file__), ".game_library.sqlite3"), "game_library.sqlite3"),
+)
+
+# Bytes of topic in a file name; with the variant, hash suffixes and
+# "_game.html" the name stays well under the usual 255-byte limit.
+MAX_SLUG = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    topic TEXT NOT NULL,
+    topic_norm TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    created_at REAL NOT NULL,
+    model TEXT,
+    latency REAL,
+    prompt_variant TEXT
+);
+CREATE INDEX IF NOT EXISTS games_topic_norm ON games (topic_norm);
+CREATE INDEX IF NOT EXISTS games_content_hash ON games (content_hash);
+CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5 (
+    topic, content='games', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS games_ai AFTER INSERT ON games BEGIN
+    INSERT INTO games_fts (rowid, topic) VALUES (new.id, new.topic);
+END;
+CREATE TRIGGER IF NOT EXISTS games_ad AFTER DELETE ON games BEGIN
+    INSERT INTO games_fts (games_fts, rowid, topic) VALUES ('delete', old.id, old.topic);
+END;
+CREATE TRIGGER IF NOT EXISTS games_au AFTER UPDATE OF topic ON games BEGIN
+    INSERT INTO games_fts (games_fts, rowid, topic) VALUES ('delete', old.id, old.topic);
+    INSERT INTO games_fts (rowid, topic) VALUES (new.id, new.topic);
+END;
+-- Edit history. A row holds either the full text (base) or a line delta
+-- against the previous version; the newest version is also the file on disk.
+CREATE TABLE IF NOT EXISTS game_versions (
+    path TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    base TEXT,
+    delta TEXT,
+    change TEXT,
+    model TEXT,
+    latency REAL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (path, version)
+);
+"""
+
+_COLUMNS = "id, topic, path, content_hash, size, created_at, model, latency, prompt_variant"
+
+
+def _topic_hash(context):
+    return hashlib.sha1(normalize_context(context).encode("utf-8")).hexdigest()[:8]
+
+
+def _slug(context):
+    """File-name stem for a topic; long topics are cut and tagged with a hash so names stay unique."""
+    slug = "_".join(normalize_context(context).split()) or "game"
+    encoded = slug.encode("utf-8")
+    if len(encoded) > MAX_SLUG:
+        # Cut on bytes, since that is what the file system limits.
+        slug = f"{encoded[:MAX_SLUG].decode('utf-8', 'ignore').rstrip('_')}_{_topic_hash(context)}"
+    return slug
+
+
+def line_delta(old, new):
+    """Edits turning `old` into `new`, as [[start, end, new_lines], ...] over old's lines."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [[i1, i2, new_lines[j1:j2]] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def apply_line_delta(old, delta):
+    lines = old.splitlines(keepends=True)
+    for start, end, replacement in reversed(delta):
+        lines[start:end] = replacement
+    return "".join(lines)
+
+
+class GameLibrary:
+    """SQLite index of the HTML games saved in web_game/.
+
+    Topics are stored verbatim alongside their normalized form, so lookups no
+    longer depend on reverse-engineering filenames. sync() reconciles the index
+    with the directory, picking up files added or removed behind its back.
+    """
+
+    def __init__(self, game_dir=LIBRARY_DIR, db_path=LIBRARY_DB):
+        self.game_dir = game_dir
+        self._lock = threading.Lock()
+        self._synced_mtime = None
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+            # Databases created before games recorded their prompt variant.
+            if "prompt_variant" not in {row["name"] for row in self._db.execute("PRAGMA table_info(games)")}:
+                self._db.execute("ALTER TABLE games ADD COLUMN prompt_variant TEXT")
+        self.sync()
+
+    def close(self):
+        self._db.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def _upsert(self, path, topic, code_hash, size, mtime, model=None, latency=None, created_at=None,
+                prompt_variant=None):
+        self._db.execute(
+            """
+            INSERT INTO games (topic, topic_norm, path, content_hash, size, mtime, created_at, model, latency,
+                               prompt_variant)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET
+                topic = excluded.topic, topic_norm = excluded.topic_norm,
+                content_hash = excluded.content_hash, size = excluded.size, mtime = excluded.mtime,
+                created_at = excluded.created_at,
+                model = COALESCE(excluded.model, games.model),
+                latency = COALESCE(excluded.latency, games.latency),
+                prompt_variant = COALESCE(excluded.prompt_variant, games.prompt_variant)
+            """,
+            (topic, normalize_context(topic), os.path.abspath(path), code_hash, size, mtime,
+             created_at or time.time(), model, latency, prompt_variant),
+        )
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.game_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def sync_if_changed(self):
+        """sync() if files were added, removed or replaced in game_dir since the last one.
+
+        Cheap enough to call on every page render: it stats the directory only.
+        """
+        if self._dir_mtime() != self._synced_mtime:
+            self.sync()
+
+    def sync(self):
+        """Index new or changed files in game_dir and drop rows whose file is gone."""
+        # Taken before scanning, so a change made during the scan triggers another sync.
+        self._synced_mtime = self._dir_mtime()
+        on_disk = {}
+        if os.path.isdir(self.game_dir):
+            for entry in os.scandir(self.game_dir):
+                if entry.is_file() and entry.name.endswith(".html"):
+                    stat = entry.stat()
+                    on_disk[os.path.abspath(entry.path)] = (stat.st_mtime, stat.st_size)
+        # Several libraries may share one database; only reconcile our own directory.
+        game_dir = os.path.abspath(self.game_dir)
+        with self._lock, self._db:
+            indexed = {
+                row["path"]: (row["mtime"], row["size"])
+                for row in self._db.execute("SELECT path, mtime, size FROM games")
+                if os.path.dirname(row["path"]) == game_dir
+            }
+            for path in indexed.keys() - on_disk.keys():
+                self._db.execute("DELETE FROM games WHERE path = ?", (path,))
+            for path, (mtime, size) in on_disk.items():
+                if indexed.get(path) == (mtime, size):
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        code = f.read()
+                except OSError:
+                    continue
+                topic = self._topic_for(path) or " ".join(context_from_filename(path).split())
+                self._upsert(path, topic, content_hash(code), size, mtime, created_at=mtime)
+
+    def _topic_for(self, path):
+        row = self._db.execute("SELECT topic FROM games WHERE path = ?", (path,)).fetchone()
+        return row["topic"] if row else None
+
+    def path_for(self, context, variant=""):
+        """Filename for `context`, disambiguated if another topic already owns the plain name.
+
+        `variant` (game_prompts.variant_slug) keeps games of one topic made
+        for different grades or game types in separate files.
+        """
+        stem = f"{_slug(context)}_{variant}" if variant else _slug(context)
+        path = os.path.abspath(os.path.join(self.game_dir, f"{stem}_game.html"))
+        owner = self._query("SELECT topic_norm FROM games WHERE path = ?", (path,))
+        if owner and owner[0]["topic_norm"] != normalize_context(context):
+            path = os.path.abspath(os.path.join(self.game_dir, f"{stem}_{_topic_hash(context)}_game.html"))
+        return path
+
+    def save_game(self, code, context, model=None, latency=None, report=None, variant="", prompt_variant=None):
+        """Write the game for `context` (skipping identical content) and index it.
+
+        An analysis report, if given, is written next to the game file.
+        `prompt_variant` (game_prompts.variant_id) is recorded so an edit can
+        find the game's cache entry later.
+        """
+        path = self.path_for(context, variant)
+        code_hash = content_hash(code)
+        existing = self._query("SELECT content_hash FROM games WHERE path = ?", (path,))
+        if not (existing and existing[0]["content_hash"] == code_hash and os.path.exists(path)):
+            os.makedirs(self.game_dir, exist_ok=True)
+            atomic_write(path, code)
+        if report is not None:
+            write_report(path, report)
+        stat = os.stat(path)
+        with self._lock, self._db:
+            self._upsert(path, context, code_hash, stat.st_size, stat.st_mtime, model, latency,
+                         prompt_variant=prompt_variant)
+        return path
+
+    def save_version(self, path, code, change, model=None, latency=None, report=None):
+        """Replace the game at `path` with an edited version, keeping its history as deltas.
+
+        The file keeps its name and topic. Returns the new version number.
+        """
+        path = os.path.abspath(path)
+        previous = self.load(path)
+        previous_hash = content_hash(previous)
+        with self._lock, self._db:
+            last = self._db.execute(
+                "SELECT version, content_hash FROM game_versions WHERE path = ? ORDER BY version DESC LIMIT 1",
+                (path,),
+            ).fetchone()
+            version = last["version"] if last else 0
+            if last is None or last["content_hash"] != previous_hash:
+                # First edit, or the file was regenerated since: snapshot it in full.
+                version += 1
+                self._db.execute(
+                    "INSERT INTO game_versions (path, version, content_hash, base, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (path, version, previous_hash, previous, os.path.getmtime(path)),
+                )
+            version += 1
+            self._db.execute(
+                "INSERT INTO game_versions (path, version, content_hash, delta, change, model, latency, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, version, content_hash(code), json.dumps(line_delta(previous, code)), change, model, latency,
+                 time.time()),
+            )
+        atomic_write(path, code)
+        if report is not None:
+            write_report(path, report)
+        stat = os.stat(path)
+        with self._lock, self._db:
+            topic = self._topic_for(path) or " ".join(context_from_filename(path).split())
+            self._upsert(path, topic, content_hash(code), stat.st_size, stat.st_mtime, model, latency)
+        return version
+
+    def versions(self, path):
+        """Edit history of the game at `path`, oldest first (empty if it was never edited)."""
+        return self._query(
+            "SELECT version, content_hash, change, model, latency, created_at, base IS NOT NULL AS full_copy "
+            "FROM game_versions WHERE path = ? ORDER BY version",
+            (os.path.abspath(path),),
+        )
+
+    def load_version(self, path, version):
+        """Text of `version`, rebuilt from the nearest full copy and the deltas after it."""
+        rows = self._query(
+            "SELECT version, base, delta FROM game_versions WHERE path = ? AND version <= ? "
+            "AND version >= (SELECT MAX(version) FROM game_versions WHERE path = ? AND version <= ? AND base IS NOT NULL) "
+            "ORDER BY version",
+            (os.path.abspath(path), version, os.path.abspath(path), version),
+        )
+        if not rows or rows[-1]["version"] != version:
+            raise KeyError(f"{path} has no version {version}")
+        code = rows[0]["base"]
+        for row in rows[1:]:
+            code = apply_line_delta(code, json.loads(row["delta"]))
+        return code
+
+    def remove(self, path):
+        for stale in (path, report_path(path)):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM games WHERE path = ?", (os.path.abspath(path),))
+            self._db.execute("DELETE FROM game_versions WHERE path = ?", (os.path.abspath(path),))
+
+    def entry(self, path):
+        """Index row for the game at `path`, or None."""
+        rows = self._query(f"SELECT {_COLUMNS} FROM games WHERE path = ?", (os.path.abspath(path),))
+        return rows[0] if rows else None
+
+    def find(self, context):
+        """Most recent game generated for exactly this (normalized) topic, or None."""
+        rows = self._query(
+            f"SELECT {_COLUMNS} FROM games WHERE topic_norm = ? ORDER BY created_at DESC LIMIT 1",
+            (normalize_context(context),),
+        )
+        return rows[0] if rows else None
+
+    def prefix_search(self, prefix, limit=20):
+        """Topics starting with `prefix`, answered by a range scan on the topic index."""
+        prefix = normalize_context(prefix)
+        return self._query(
+            f"SELECT {_COLUMNS} FROM games WHERE topic_norm >= ? AND topic_norm < ? "
+            "ORDER BY topic_norm LIMIT ?",
+            (prefix, prefix + "\uffff", limit),
+        )
+
+    def search(self, query, limit=20):
+        """Full-text search over topics; every word must match, the last as a prefix."""
+        words = normalize_context(query).split()
+        if not words:
+            return []
+        match = " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+        return self._query(
+            f"SELECT {', '.join('games.' + c for c in _COLUMNS.split(', '))} FROM games_fts "
+            "JOIN games ON games.id = games_fts.rowid WHERE games_fts MATCH ? ORDER BY rank LIMIT ?",
+            (match.strip(), limit),
+        )
+
+    def load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+_default_library = None
+_default_library_lock = threading.Lock()
+
+
+def get_game_library():
+    """Process-wide library for web_game/, opened (and synced) on first use."""
+    global _default_library
+    with _default_library_lock:
+        if _default_library is None:
+            _default_library = GameLibrary()
+        return _default_library
@@ -0,0 +1,92 @@
+# game_prompts.py
+"""Versioned prompt templates for game generation.
+
+A prompt is a system prefix that depends only on the template version and
+variant (grade, game type), followed by a one-line user message naming the
+topic. Every request for a variant starts with the same bytes, which is what
+provider-side context caching matches on, and the topic adds only a few
+input tokens.
+"""
+import functools
+
+# Bump (and add a new entry to TEMPLATES) whenever the wording changes, so
+# games cached under the old wording are not served.
+TEMPLATE_VERSION = 4
+DEFAULT_GRADE = 5
+DEFAULT_GAME_TYPE = "any"
+MIN_GRADE, MAX_GRADE = 0, 12
+
+GAME_TYPES = {
+    "any": "Pick the mechanic that fits the topic: sorting, classifying, matching, answering questions, moving or making decisions.",
+    "sorting": "Make it a sorting game: items appear one by one and the player puts each into the correct category.",
+    "quiz": "Make it a quiz game: short questions with clickable answers, instant feedback and a short explanation.",
+    "matching": "Make it a matching game: the player pairs related cards, pictures or words.",
+    "arcade": "Make it an arcade game: the player steers a character to collect correct items and avoid wrong ones.",
+    "simulation": "Make it a simple simulation: the player changes a few settings and watches the effect.",
+}
+
+TEMPLATES = {
+    4: {
+        "prefix": """You write small educational browser games for children, using HTML5 Canvas and vanilla JavaScript only (no libraries such as Phaser.js or p5.js).
+
+For the topic in the next message, write one complete HTML file with embedded JavaScript that teaches it to {audience} in a fun, interactive, age-appropriate way.
+
+Requirements:
+1. A single, complete HTML file.
+2. Canvas-based visuals, animation and interactivity.
+3. Gameplay that teaches the topic, with correct/incorrect feedback. {mechanic}
+4. Clear instructions, simple score tracking and, if possible, gradually increasing difficulty.
+5. Bright colors and simple shapes or sprite-like drawings on the canvas.
+
+Reply with only the HTML code as plain text: no markdown, no triple backticks, no explanations.""",
+        "suffix": 'Topic: "{topic}"',
+    },
+}
+
+
+def resolve_grade(grade=None, age=None):
+    """School grade for a variant; an age is mapped to the grade usually taught at it."""
+    if grade is None:
+        grade = DEFAULT_GRADE if age is None else age - 5
+    return min(MAX_GRADE, max(MIN_GRADE, int(grade)))
+
+
+def variant_id(grade=None, age=None, game_type=DEFAULT_GAME_TYPE, version=TEMPLATE_VERSION):
+    """Stable name of a template variant, used as the cache key's prompt version and in metrics."""
+    if game_type not in GAME_TYPES:
+        raise ValueError(f"Unknown game type {game_type!r}; expected one of {sorted(GAME_TYPES)}")
+    return f"v{version}/grade{resolve_grade(grade, age)}/{game_type}"
+
+
+def variant_slug(grade=None, age=None, game_type=DEFAULT_GAME_TYPE):
+    """File-name part telling saved games of one topic apart; empty for the default variant.
+
+    The template version is left out so a wording bump doesn't rename saved games.
+    """
+    grade = resolve_grade(grade, age)
+    if grade == DEFAULT_GRADE and game_type == DEFAULT_GAME_TYPE:
+        return ""
+    return f"grade{grade}_{game_type}"
+
+
+def _audience(grade):
+    if grade == 0:
+        return "a kindergarten student (around 5–6 years old)"
+    suffix = {1: "st", 2: "nd", 3: "rd"}.get(grade, "th")
+    return f"a {grade}{suffix}-grade student (around {grade + 5}–{grade + 6} years old)"
+
+
+@functools.lru_cache(maxsize=None)
+def _prefix(version, grade, game_type):
+    return TEMPLATES[version]["prefix"].format(audience=_audience(grade), mechanic=GAME_TYPES[game_type])
+
+
+def compile_prompt(topic, grade=None, age=None, game_type=DEFAULT_GAME_TYPE, version=TEMPLATE_VERSION):
+    """Return (variant_id, messages) for `topic`, ready for a chat model's invoke/stream."""
+    variant = variant_id(grade, age, game_type, version)
+    prefix = _prefix(version, resolve_grade(grade, age), game_type)
+    suffix = TEMPLATES[version]["suffix"].format(topic=topic.strip())
+    return variant, [("system", prefix), ("human", suffix)]
+
+
+DEFAULT_VARIANT = variant_id()
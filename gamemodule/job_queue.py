@@ -0,0 +1,174 @@
+# job_queue.py
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from gamemodule.game_cache import normalize_context
+from gamemodule.game_editor import edit_game_code
+from gamemodule.game_generator import MODEL_NAME, game_cache, stream_game_code
+from gamemodule.game_library import get_game_library
+from gamemodule.game_prompts import variant_id, variant_slug
+
+DEFAULT_WORKERS = 4
+# Finished jobs are kept this long so a session that polls late still sees them.
+JOB_TTL_SECONDS = 60 * 60
+
+
+class GameJob:
+    """State of one background generation or edit, read by polling Streamlit sessions.
+
+    Edits carry the requested `change` and the `path` of the game they patch.
+    """
+
+    def __init__(self, context, refresh, variant=None, change=None, path=None):
+        self.id = uuid.uuid4().hex
+        self.context = context
+        self.refresh = refresh
+        self.variant = variant or {}
+        self.change = change
+        self.status = "queued"  # queued -> running -> done | failed
+        self.partial = ""
+        self.code = None
+        self.report = None
+        self.model_name = None
+        self.path = path
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.subscribers = 1
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+
+class GameJobQueue:
+    """Bounded worker pool for game generation and edits, shared by every session.
+
+    Submitting a topic (and prompt variant) that is already queued or running
+    returns the existing job instead of starting another model call, so
+    concurrent users asking for the same game share one generation. A
+    "Regenerate" request never joins a plain one, which may be a cache hit.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, library=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="game-job")
+        self._library = library
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, context, refresh=False, **variant):
+        """Queue `context` for generation and return the job id to poll.
+
+        Keyword arguments (grade, age, game_type) pick the prompt variant.
+        """
+        key = (normalize_context(context), variant_id(**variant), bool(refresh))
+        # A regeneration already under way also answers a plain request, but a
+        # plain one (which may come from the cache) can't stand in for a refresh.
+        shared = () if refresh else (key[:2] + (True,),)
+        return self._enqueue(key, lambda: GameJob(context, refresh, variant), self._generate, shared)
+
+    def submit_edit(self, path, change):
+        """Queue `change` to the saved game at `path` and return the job id to poll."""
+        path = os.path.abspath(path)
+        entry = self._get_library().entry(path)
+        context = entry["topic"] if entry else os.path.basename(path)
+        key = ("edit", path, change.strip())
+        return self._enqueue(key, lambda: GameJob(context, False, change=change, path=path), self._edit)
+
+    def _enqueue(self, key, make_job, work, shared=()):
+        """Start a job under `key`, or join the one in flight under it or any `shared` key."""
+        with self._lock:
+            self._prune()
+            for existing in (key, *shared):
+                job = self._in_flight.get(existing)
+                if job is not None:
+                    job.subscribers += 1
+                    return job.id
+            job = make_job()
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        self._pool.submit(self._run, job, key, work)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _get_library(self):
+        return self._library or get_game_library()
+
+    def _run(self, job, key, work):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            work(job)
+            job.finished_at = time.time()
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.finished_at = time.time()
+            job.status = "failed"
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is job:
+                    del self._in_flight[key]
+
+    def _generate(self, job):
+        stream = stream_game_code(job.context, refresh=job.refresh, **job.variant)
+        for chunk in stream:
+            # Rebinding a str is atomic, so pollers always see a consistent prefix.
+            job.partial += chunk
+        if not stream.code:
+            raise RuntimeError("Failed to generate game code.")
+        job.path = self._get_library().save_game(
+            stream.code, job.context, model=stream.model_name,
+            latency=time.time() - job.started_at,
+            report=None if stream.cached else stream.report,
+            variant=variant_slug(**job.variant),
+            prompt_variant=stream.prompt_variant,
+        )
+        job.code, job.report, job.model_name = stream.code, stream.report, stream.model_name
+
+    def _edit(self, job):
+        library = self._get_library()
+        result = edit_game_code(library.load(job.path), job.change)
+        library.save_version(job.path, result["code"], job.change, model=result["model"],
+                             latency=result["latency"], report=result["report"])
+        # Generate answers from the cache before it reaches the library, so the
+        # cached game must become the edited one or the next request for this
+        # topic would serve (and save over) the pre-edit version.
+        entry = library.entry(job.path)
+        if entry and entry["prompt_variant"]:
+            try:
+                game_cache.put(entry["topic"], entry["prompt_variant"], MODEL_NAME, result["code"], source="edit")
+            except OSError as e:
+                print(f"Failed to cache edited game: {e}")
+                game_cache.invalidate(entry["topic"], entry["prompt_variant"], MODEL_NAME)
+        job.code, job.report, job.model_name = result["code"], result["report"], result["model"]
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide job queue, started on first use."""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = GameJobQueue()
+        return _default_queue
@@ -1,51 +1,154 @@
 # st_game.py
 import streamlit as st
-import subprocess
-import sys
 import os
-from gamemodule.game_generator import generate_game_code
+from app_resources import chat_client, game_library, job_queue
+from gamemodule.game_generator import routed_model_name
+from gamemodule.game_prompts import DEFAULT_GAME_TYPE, DEFAULT_GRADE, GAME_TYPES, MAX_GRADE, MIN_GRADE
 
-st.set_page_config(layout="wide")
 st.title("Web-Ready 2D Game Generator (via Pygbag)")
 
 st.write("Enter a context (e.g., 'waste management') to generate a playable 2D Pygame (via Pygbag).")
 
-context = st.text_input("Game Context", "waste management")
+# Shared across pages and sessions; see app.py.
+library = game_library()
+jobs = job_queue()
 
-if st.button("Generate Game"):
-    if context:
-        code = generate_game_code(context)
-        if code:
-            st.session_state.game_code = code
-            st.success("Game code generated successfully!")
-        else:
-            st.error("Failed to generate game code.")
 
-# Show generated HTML game
-if 'game_code' in st.session_state:
-    st.subheader("Generated Game Code (HTML + JavaScript)")
-    st.code(st.session_state.game_code, language='html')
+def set_game(code, file_name, path=None):
+    st.session_state.game_code = code
+    st.session_state.game_filename = file_name
+    st.session_state.game_path = path
+
+
+# Reuse a game that was already generated instead of paying for a new one.
+with st.sidebar:
+    st.header("Game Library")
+    # Pick up game files added or deleted in web_game/ behind the index.
+    library.sync_if_changed()
+    query = st.text_input("Search saved games")
+    matches = library.search(query) if query else library.prefix_search("", limit=10)
+    for game in matches:
+        if st.button(game["topic"], key=f"open_{game['id']}"):
+            try:
+                set_game(library.load(game["path"]), os.path.basename(game["path"]), game["path"])
+            except OSError:
+                # The file vanished since the index was built; resync and carry on.
+                library.sync()
+                st.warning("That game file no longer exists.")
+
+# A form keeps typing in the context box from rerunning the script; only the
+# submit button does.
+with st.form("generate_form"):
+    context = st.text_input("Game Context", "waste management")
+    grade_col, type_col = st.columns(2)
+    grade = grade_col.selectbox("Grade", list(range(MIN_GRADE, MAX_GRADE + 1)), index=DEFAULT_GRADE - MIN_GRADE,
+                                format_func=lambda g: "Kindergarten" if g == 0 else f"Grade {g}")
+    game_type = type_col.selectbox("Game type", list(GAME_TYPES), index=list(GAME_TYPES).index(DEFAULT_GAME_TYPE))
+    refresh = st.checkbox("Regenerate (ignore cached game)", value=False)
+    submitted = st.form_submit_button("Generate Game")
+
+# Generation runs on the shared worker pool; this session only keeps the job
+# id and polls it, so reruns never cancel or duplicate the model call.
+if submitted and context:
+    try:
+        # Build the client here, once per process, so a missing key shows up
+        # on the page instead of inside a worker thread.
+        chat_client(routed_model_name())
+    except Exception as e:
+        st.error(f"Could not connect to the model: {e}")
+    else:
+        st.session_state.job_id = jobs.submit(context, refresh=refresh, grade=grade, game_type=game_type)
+
+
+@st.fragment(run_every=1.0)
+def show_job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        # Pruned, or the queue was rebuilt; stop polling for it.
+        st.session_state.pop("job_id", None)
+        st.rerun()
+    if not job.finished:
+        position = "" if job.status == "running" else f" ({jobs.pending()} job(s) in progress)"
+        action = f"Editing Game: {job.change}" if job.change else f"Generating Game Code: {job.context}"
+        st.subheader(f"{action}{position}...")
+        # Render the code pane progressively while the model is still writing.
+        if job.partial:
+            st.code(job.partial, language='html')
+        return
+    st.session_state.pop("job_id", None)
+    if job.status == "done":
+        set_game(job.code, os.path.basename(job.path), job.path)
+        st.session_state.game_findings = job.report["findings"]
+        st.session_state.game_notice = "Game edited successfully!" if job.change else "Game code generated successfully!"
+    else:
+        failed = "Failed to edit game" if job.change else "Failed to generate game code"
+        st.session_state.game_error = f"{failed}: {job.error}"
+    # Leave the polling fragment and redraw the page with the finished game.
+    st.rerun()
 
-    game_filename = f"{context.replace(' ', '_')}_game.html"
-    game_folder = "web_game"
-    os.makedirs(game_folder, exist_ok=True)
-    game_path = os.path.join(game_folder, game_filename)
 
-    # Save HTML game file
-    with open(game_path, "w", encoding="utf-8") as f:
-        f.write(st.session_state.game_code)
+if "job_id" in st.session_state:
+    show_job_status(st.session_state.job_id)
+
+if "game_error" in st.session_state:
+    st.error(st.session_state.pop("game_error"))
+if "game_findings" in st.session_state:
+    st.success(st.session_state.pop("game_notice", "Game code generated successfully!"))
+    for finding in st.session_state.pop("game_findings"):
+        st.warning(f"Line {finding['line']} [{finding['rule']}]: {finding['message']}")
+
+
+@st.fragment
+def show_game(game_code, file_name):
+    st.subheader("Generated Game Code (HTML + JavaScript)")
+    with st.expander("Show code"):
+        st.code(game_code, language='html')
 
     # Provide download
     st.download_button(
         label="Download HTML Game",
-        data=st.session_state.game_code,
-        file_name=game_filename,
+        data=game_code,
+        file_name=file_name,
         mime="text/html"
     )
 
     # Render the game inside Streamlit
     st.markdown("### Live Preview")
     try:
-        st.components.v1.html(st.session_state.game_code, height=600, scrolling=True)
+        st.components.v1.html(game_code, height=600, scrolling=True)
     except Exception as e:
-        st.error(f"Error rendering game: {e}")
\ No newline at end of file
+        st.error(f"Error rendering game: {e}")
+
+
+def show_editor(path):
+    st.markdown("### Edit This Game")
+    # Small tweaks are sent as a patch against the saved file instead of a
+    # full regeneration; the previous versions are kept in the library.
+    with st.form("edit_form"):
+        change = st.text_input("Change to make", placeholder="e.g. make it easier, or show instructions before the game starts")
+        submitted = st.form_submit_button("Apply Edit")
+    # The patch is written on the shared worker pool, like a generation, and
+    # picked up by show_job_status.
+    if submitted and change and "job_id" in st.session_state:
+        st.warning("Wait for the current game to finish before editing it.")
+    elif submitted and change:
+        try:
+            chat_client(routed_model_name())
+        except Exception as e:
+            st.error(f"Could not connect to the model: {e}")
+        else:
+            st.session_state.job_id = jobs.submit_edit(path, change)
+            st.rerun()
+    history = library.versions(path)
+    if history:
+        with st.expander(f"Version history ({len(history)})"):
+            for version in history:
+                st.write(f"v{version['version']}: {version['change'] or 'original'}")
+
+
+# Show generated HTML game. Being a fragment, interactions inside it (like the
+# download button) rerun only this block instead of the whole page.
+if 'game_code' in st.session_state:
+    show_game(st.session_state.game_code, st.session_state.game_filename)
+    if st.session_state.get("game_path"):
+        show_editor(st.session_state.game_path)
@@ -0,0 +1,188 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from replay_models import data_path
+
+CACHE_DIR = os.environ.get(
+    "IMAGE_CACHE_DIR",
+    data_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".image_cache"), "image_cache"),
+)
+MAX_BYTES = 500 * 1024 * 1024
+# Hamming distance (out of 64 bits) under which two dHashes count as the same picture.
+NEAR_DUPLICATE_DISTANCE = 5
+
+# Only these generation settings change the pixels; anything else (callbacks,
+# worker counts) must not split the cache.
+KEY_SETTINGS = ("negative_prompt", "aspect_ratio", "person_generation", "safety_filter_level", "add_watermark", "seed")
+
+
+def image_key(model_name, prompt, **settings):
+    payload = {"model": model_name, "prompt": " ".join(prompt.split())}
+    payload.update({name: settings[name] for name in KEY_SETTINGS if name in settings})
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def perceptual_hash(path):
+    """64-bit difference hash of the image at `path`, or None without Pillow."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    with Image.open(path) as image:
+        image.draft("L", (64, 64))
+        pixels = list(image.convert("L").resize((9, 8)).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def hamming_distance(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+class ImageCache:
+    """Prompt-keyed cache of generated PNGs with an LRU byte budget.
+
+    Entries are `<key>.json` metadata files pointing at a PNG blob. Normally
+    the blob is `<key>.png`, but with perceptual dedupe enabled an image that
+    is a near-duplicate of one already cached just points at the existing blob.
+    Metadata mtimes are the LRU clock; a blob is deleted once no entry uses it.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, dedupe=False,
+                 max_distance=NEAR_DUPLICATE_DISTANCE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.dedupe = dedupe
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._phash_index = None
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _blob_path(self, blob):
+        return os.path.join(self.cache_dir, blob + ".png")
+
+    def _read_meta(self, key):
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key):
+        """Path of the cached PNG for `key`, or None. A hit refreshes its LRU position."""
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        path = self._blob_path(meta["blob"])
+        if not os.path.exists(path):
+            return None
+        now = time.time()
+        try:
+            os.utime(self._meta_path(key), (now, now))
+        except OSError:
+            pass
+        return path
+
+    def fetch(self, key, destination):
+        """Copy the cached image for `key` to `destination`; True on a hit."""
+        path = self.get(key)
+        if path is None:
+            return False
+        shutil.copyfile(path, destination)
+        return True
+
+    def put(self, key, image_path, **metadata):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            blob = key
+            phash = perceptual_hash(image_path) if self.dedupe else None
+            if phash is not None:
+                duplicate = self._find_near_duplicate(phash)
+                if duplicate is not None:
+                    blob = duplicate
+            if blob == key:
+                tmp_path = self._blob_path(key) + ".tmp"
+                shutil.copyfile(image_path, tmp_path)
+                os.replace(tmp_path, self._blob_path(key))
+            meta = dict(metadata, blob=blob, phash=phash, size=os.path.getsize(self._blob_path(blob)),
+                        created_at=time.time())
+            tmp_path = self._meta_path(key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self._meta_path(key))
+            if phash is not None and blob == key:
+                self._phash_index[phash] = blob
+            self.evict()
+        return self._blob_path(blob)
+
+    def _find_near_duplicate(self, phash):
+        if self._phash_index is None:
+            self._phash_index = {}
+            for meta_path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+                key = os.path.basename(meta_path)[: -len(".json")]
+                meta = self._read_meta(key)
+                if meta and meta.get("phash") and meta["blob"] == key:
+                    self._phash_index[meta["phash"]] = key
+        best, best_distance = None, self.max_distance + 1
+        for other, blob in self._phash_index.items():
+            distance = hamming_distance(phash, other)
+            if distance < best_distance and os.path.exists(self._blob_path(blob)):
+                best, best_distance = blob, distance
+        return best
+
+    def evict(self):
+        """Drop least recently used entries until the blobs fit in max_bytes."""
+        entries = []
+        for meta_path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            key = os.path.basename(meta_path)[: -len(".json")]
+            meta = self._read_meta(key)
+            try:
+                mtime = os.path.getmtime(meta_path)
+            except OSError:
+                continue
+            entries.append((mtime, key, meta["blob"] if meta else None))
+
+        referenced = {blob for _, _, blob in entries if blob}
+        for blob_path in glob.glob(os.path.join(self.cache_dir, "*.png")):
+            if os.path.basename(blob_path)[: -len(".png")] not in referenced:
+                self._remove(blob_path)
+
+        def blob_size(blob):
+            try:
+                return os.path.getsize(self._blob_path(blob))
+            except OSError:
+                return 0
+
+        total = sum(blob_size(blob) for blob in referenced)
+        if self.max_bytes is None or total <= self.max_bytes:
+            return
+        users = {}
+        for _, key, blob in entries:
+            users.setdefault(blob, set()).add(key)
+        for _, key, blob in sorted(entries):
+            self._remove(self._meta_path(key))
+            users.get(blob, set()).discard(key)
+            if blob and not users.get(blob):
+                total -= blob_size(blob)
+                self._remove(self._blob_path(blob))
+                if self._phash_index is not None:
+                    self._phash_index = {h: b for h, b in self._phash_index.items() if b != blob}
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
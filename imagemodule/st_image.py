@@ -1,24 +1,125 @@
 import os
+import shutil
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
-from vertexai.preview.vision_models import ImageGenerationModel
-import vertexai
-import os
-
-# Load variables from .env file
-load_dotenv()
-
-# Optional: manually fetch them if you want to reuse
-project_id = os.getenv("PROJECT_ID")
-location = os.getenv("LOCATION")
-GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-print(project_id,GOOGLE_APPLICATION_CREDENTIALS)
-# Initialize Vertex AI
-vertexai.init(project=project_id, location=location)
-# Step 3: Load the model
-generation_model = ImageGenerationModel.from_pretrained("imagen-4.0-generate-preview-06-06")
-
-# Step 4: Prompt input
-prompt_text = """
+from imagemodule.image_cache import ImageCache
+from imagemodule.storyboard import generate_storyboard_images, parse_storyboard
+from replay_models import replay_enabled
+
+MODEL_NAME = "imagen-4.0-generate-preview-06-06"
+IMAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# The scene_*.png files in IMAGE_DIR are the recordings ReplayImageModel
+# serves, so generated storyboards go here instead, one directory per run.
+STORYBOARD_DIR = os.path.join(IMAGE_DIR, ".storyboards")
+STORYBOARD_MAX_AGE = 24 * 60 * 60
+
+GENERATION_SETTINGS = {
+    "aspect_ratio": "1:1",
+    "negative_prompt": "",
+    "person_generation": "allow_all",
+    "safety_filter_level": "block_few",
+    "add_watermark": True,
+}
+
+# Vertex is initialised and the model loaded on first use only; every later
+# call in the process reuses the same handle.
+_models = {}
+_models_lock = threading.Lock()
+
+image_cache = ImageCache()
+
+
+def get_generation_model(model_name=MODEL_NAME):
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            if replay_enabled():
+                # Recorded scenes with simulated latency; see replay_models.
+                from replay_models import ReplayImageModel as ImageGenerationModel
+            else:
+                import vertexai
+                from vertexai.preview.vision_models import ImageGenerationModel
+
+                # Load variables from .env file
+                load_dotenv()
+                vertexai.init(project=os.getenv("PROJECT_ID"), location=os.getenv("LOCATION"))
+            model = ImageGenerationModel.from_pretrained(model_name)
+            _models[model_name] = model
+    return model
+
+
+def to_scenes(prompts):
+    """Accept storyboard text, a list of prompt strings or a list of scene dicts."""
+    if isinstance(prompts, str):
+        return parse_storyboard(prompts)
+    scenes = []
+    for i, prompt in enumerate(prompts):
+        if isinstance(prompt, dict):
+            scenes.append(prompt)
+        else:
+            scenes.append({"index": i + 1, "title": "", "prompt": prompt})
+    return scenes
+
+
+def new_storyboard_dir():
+    """Empty directory for one storyboard run; runs older than STORYBOARD_MAX_AGE are removed."""
+    cutoff = time.time() - STORYBOARD_MAX_AGE
+    if os.path.isdir(STORYBOARD_DIR):
+        for entry in os.scandir(STORYBOARD_DIR):
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                pass
+    path = os.path.join(STORYBOARD_DIR, uuid.uuid4().hex)
+    os.makedirs(path)
+    return path
+
+
+def generate_storyboard(prompts, output_dir=None, model=None, max_workers=None, on_result=None,
+                        use_cache=True, **settings):
+    """Generate scene_<N>.png for each storyboard scene and return per-scene results.
+
+    `model` defaults to the shared Imagen handle; pass a StubImageModel to run
+    offline. Keyword settings override GENERATION_SETTINGS. Unchanged scenes
+    are served from image_cache unless use_cache=False. Images go to a new
+    directory under STORYBOARD_DIR unless `output_dir` is given.
+    """
+    model_name = MODEL_NAME
+    if model is None:
+        model = get_generation_model()
+    else:
+        model_name = getattr(model, "model_name", type(model).__name__)
+    if output_dir is None:
+        output_dir = new_storyboard_dir()
+    generation_kwargs = dict(GENERATION_SETTINGS, **settings)
+    pool_kwargs = {} if max_workers is None else {"max_workers": max_workers}
+    return generate_storyboard_images(
+        to_scenes(prompts),
+        model,
+        output_dir=output_dir,
+        on_result=on_result,
+        cache=image_cache if use_cache else None,
+        model_name=model_name,
+        **pool_kwargs,
+        **generation_kwargs,
+    )
+
+
+def print_result(result):
+    if result["error"]:
+        print(f"Scene {result['index']} failed: {result['error']}")
+    else:
+        source = "cache" if result["cached"] else f"{result['latency']:.1f}s"
+        print(f"Saved: {result['path']} ({source})")
+
+
+DEMO_STORYBOARD = """
 📖 Storyboard + Image Generation Prompts
 🟣 Scene 1: The Misty Woods of Curion
 Narrative:
@@ -89,24 +190,6 @@ Image Prompt:
 Lia holds a glowing periodic table scroll with light lines connecting elements. Behind her, the elemental spirits of Group 1 float in the air, each glowing in their flame color.
 """
 
-# Step 5: Generate images
-images = generation_model.generate_images(
-    prompt=prompt_text,
-    number_of_images=4,
-    aspect_ratio="1:1",
-    negative_prompt="",
-    person_generation="allow_all",
-    safety_filter_level="block_few",
-    add_watermark=True,
-)
-
-# Step 6: Save image
-def save_image(image, index):
-    # image is a PIL.Image or similar object with .save()
-    filename = f"scene_{index + 1}.png"
-    image.save(filename)
-    print(f"Saved: {filename}")
-
-# Step 7: Save all generated images
-for i, img in enumerate(images):
-    save_image(img, i)
+
+if __name__ == "__main__":
+    generate_storyboard(DEMO_STORYBOARD, on_result=print_result)
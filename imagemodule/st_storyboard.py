@@ -0,0 +1,43 @@
+# st_storyboard.py
+import streamlit as st
+from app_resources import image_model
+from imagemodule.st_image import DEMO_STORYBOARD, generate_storyboard, to_scenes
+from imagemodule.utility import show_previews
+
+st.title("Storyboard Image Generator")
+
+st.write("Paste a storyboard with 'Image Prompt:' sections to render one picture per scene.")
+
+with st.form("storyboard_form"):
+    storyboard = st.text_area("Storyboard", DEMO_STORYBOARD.strip(), height=300)
+    use_cache = st.checkbox("Reuse cached scenes", value=True)
+    submitted = st.form_submit_button("Generate Images")
+
+if submitted:
+    scenes = to_scenes(storyboard)
+    if not scenes:
+        st.warning("No 'Image Prompt:' sections found.")
+    else:
+        try:
+            # Vertex is imported and initialised here, the first time a user asks for images.
+            image_model()
+        except Exception as e:
+            st.error(f"Could not load the image model: {e}")
+        else:
+            progress = st.progress(0.0, text="Generating scenes...")
+            done = []
+
+            def on_result(result):
+                done.append(result)
+                progress.progress(len(done) / len(scenes), text=f"{len(done)} / {len(scenes)} scenes")
+
+            # Each run writes to its own directory, so sessions never overwrite
+            # each other's scenes (or the recorded ones in imagemodule/).
+            results = generate_storyboard(scenes, use_cache=use_cache, on_result=on_result)
+            for result in results:
+                if result["error"]:
+                    st.error(f"Scene {result['index']} failed: {result['error']}")
+            st.session_state.storyboard_paths = [r["path"] for r in results if r["path"]]
+
+if st.session_state.get("storyboard_paths"):
+    show_previews(st.session_state.storyboard_paths, target="streamlit")
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from imagemodule.image_cache import KEY_SETTINGS, image_key
+from instrumentation import record_cache_hit, record_call
+
+DEFAULT_WORKERS = 4
+
+_SCENE_HEADER = re.compile(r"^\W*(?:(?:Scene\s+(\d+))|(Final\s+Scene))\s*[:\-—]\s*(.*)$", re.IGNORECASE)
+_IMAGE_PROMPT = re.compile(r"^\s*Image\s+Prompt\s*:\s*(.*)$", re.IGNORECASE)
+_SECTION_LABEL = re.compile(r"^\s*(Narrative|Key\s+Concept|Image\s+Prompt)\s*:", re.IGNORECASE)
+
+
+def parse_storyboard(text):
+    """Split a "Scene N: ... Image Prompt: ..." storyboard into one job per scene.
+
+    Returns a list of {"index", "title", "prompt"} dicts in storyboard order.
+    "Final Scene" is numbered after the highest explicit scene number, and
+    scenes without an Image Prompt block are skipped.
+    """
+    scenes = []
+    current = None
+    in_prompt = False
+    for line in text.splitlines():
+        header = _SCENE_HEADER.match(line)
+        if header:
+            number, _, title = header.groups()
+            current = {"index": int(number) if number else None, "title": title.strip(), "prompt": []}
+            scenes.append(current)
+            in_prompt = False
+            continue
+        if current is None:
+            continue
+        prompt = _IMAGE_PROMPT.match(line)
+        if prompt:
+            in_prompt = True
+            if prompt.group(1).strip():
+                current["prompt"].append(prompt.group(1).strip())
+        elif _SECTION_LABEL.match(line):
+            in_prompt = False
+        elif in_prompt and line.strip():
+            current["prompt"].append(line.strip())
+
+    jobs = []
+    last_index = 0
+    for scene in scenes:
+        index = scene["index"] if scene["index"] is not None else last_index + 1
+        last_index = max(last_index, index)
+        if scene["prompt"]:
+            jobs.append({"index": index, "title": scene["title"], "prompt": " ".join(scene["prompt"])})
+    return jobs
+
+
+def scene_filename(index):
+    return f"scene_{index}.png"
+
+
+def _save_atomically(image, path):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp.png"
+    try:
+        image.save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def generate_scene(model, scene, output_dir, cache=None, model_name="", **generation_kwargs):
+    start = time.perf_counter()
+    path = os.path.join(output_dir, scene_filename(scene["index"]))
+    if cache is not None:
+        key = image_key(model_name, scene["prompt"], **generation_kwargs)
+        if cache.fetch(key, path):
+            record_cache_hit("generate_storyboard", model_name)
+            return {"index": scene["index"], "path": path, "latency": time.perf_counter() - start,
+                    "cached": True, "error": None}
+    with record_call("generate_storyboard", model_name):
+        response = model.generate_images(prompt=scene["prompt"], number_of_images=1, **generation_kwargs)
+    images = list(response.images)
+    if not images:
+        raise RuntimeError(f"No image returned for scene {scene['index']} (blocked by safety filters?)")
+    _save_atomically(images[0], path)
+    if cache is not None:
+        cache.put(key, path, model=model_name, prompt=scene["prompt"],
+                  settings={k: v for k, v in generation_kwargs.items() if k in KEY_SETTINGS})
+    return {"index": scene["index"], "path": path, "latency": time.perf_counter() - start,
+            "cached": False, "error": None}
+
+
+def generate_storyboard_images(
+    scenes,
+    model,
+    output_dir=".",
+    max_workers=DEFAULT_WORKERS,
+    on_result=None,
+    cache=None,
+    model_name="",
+    **generation_kwargs,
+):
+    """Generate one image per scene concurrently with a bounded worker pool.
+
+    Each image is written to scene_<index>.png as soon as its request returns,
+    so a slow scene never holds up the others. Failures are recorded per scene
+    instead of aborting the run. Returns results sorted by scene index.
+
+    With an ImageCache, scenes whose (model_name, prompt, settings) were
+    generated before are copied from the cache instead of paying for them again.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(generate_scene, model, scene, output_dir, cache, model_name, **generation_kwargs): scene
+            for scene in scenes
+        }
+        for future in as_completed(futures):
+            scene = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"index": scene["index"], "path": None, "latency": None, "cached": False,
+                          "error": f"{type(e).__name__}: {e}"}
+            if on_result is not None:
+                on_result(result)
+            results.append(result)
+    return sorted(results, key=lambda r: r["index"])
+
+
+class StubImage:
+    """Solid-colour PNG standing in for a Vertex GeneratedImage."""
+
+    def __init__(self, color, size=64):
+        self.color = color
+        self.size = size
+
+    def save(self, location, include_generation_parameters=False):
+        with open(location, "wb") as f:
+            f.write(_solid_png(self.size, self.size, self.color))
+
+
+class StubImageModel:
+    """Offline stand-in for ImageGenerationModel with an optional per-call delay.
+
+    Colours are derived from the prompt, so the same prompt always yields the
+    same bytes and tests can tell scenes apart.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_images(self, prompt, number_of_images=1, **kwargs):
+        with self._lock:
+            self.calls.append(prompt)
+        if self.delay:
+            time.sleep(self.delay)
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        images = [StubImage(tuple(digest[i * 3:i * 3 + 3])) for i in range(number_of_images)]
+        return _StubResponse(images)
+
+
+class _StubResponse:
+    def __init__(self, images):
+        self.images = images
+
+    def __getitem__(self, index):
+        return self.images[index]
+
+    def __iter__(self):
+        return iter(self.images)
+
+
+def _solid_png(width, height, color):
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes(color) * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
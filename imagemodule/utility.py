@@ -1,19 +1,99 @@
+import glob
+import hashlib
+import os
+import threading
 import typing
-import IPython.display
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image as PIL_Image
 from PIL import ImageOps as PIL_ImageOps
 
+THUMBNAIL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".thumbnails")
+THUMBNAIL_QUALITY = 85
+
+
+def _downscale(pil_image: PIL_Image.Image, max_width: int, max_height: int) -> PIL_Image.Image:
+    """Shrink to fit (max_width, max_height) first, convert to RGB last.
+
+    draft() lets JPEG decoders skip straight to a smaller scale and reduce()
+    does cheap integer box downsampling, so the exact resize and the mode
+    conversion only ever touch a thumbnail-sized image.
+    """
+    image_width, image_height = pil_image.size
+    if max_width < image_width or max_height < image_height:
+        pil_image.draft("RGB", (max_width, max_height))
+        image_width, image_height = pil_image.size
+        factor = min(image_width // max_width, image_height // max_height)
+        if factor >= 2:
+            pil_image = pil_image.reduce(factor)
+        # Resize to display a smaller notebook image
+        pil_image = PIL_ImageOps.contain(pil_image, (max_width, max_height))
+    if pil_image.mode != "RGB":
+        # RGB is supported by all Jupyter environments (e.g. RGBA is not yet)
+        pil_image = pil_image.convert("RGB")
+    return pil_image
+
+
 def display_image(
     image,
     max_width: int = 600,
     max_height: int = 350,
 ) -> None:
+    import IPython.display
+
     pil_image = typing.cast(PIL_Image.Image, image._pil_image)
-    if pil_image.mode != "RGB":
-        # RGB is supported by all Jupyter environments (e.g. RGBA is not yet)
-        pil_image = pil_image.convert("RGB")
-    image_width, image_height = pil_image.size
-    if max_width < image_width or max_height < image_height:
-        # Resize to display a smaller notebook image
-        pil_image = PIL_ImageOps.contain(pil_image, (max_width, max_height))
-    IPython.display.display(pil_image)
\ No newline at end of file
+    IPython.display.display(_downscale(pil_image, max_width, max_height))
+
+
+def thumbnail_path(
+    path: str,
+    max_width: int = 600,
+    max_height: int = 350,
+    cache_dir: str = THUMBNAIL_DIR,
+) -> str:
+    """Return a cached JPEG thumbnail of the image at `path`, building it on first use.
+
+    The cache key includes the source mtime and size, so regenerated scenes get
+    a fresh thumbnail while unchanged ones are served straight from disk.
+    """
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{max_width}x{max_height}"
+    thumb = os.path.join(cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
+    if os.path.exists(thumb):
+        return thumb
+    os.makedirs(cache_dir, exist_ok=True)
+    with PIL_Image.open(path) as pil_image:
+        preview = _downscale(pil_image, max_width, max_height)
+        tmp_path = f"{thumb}.{os.getpid()}.{threading.get_ident()}.tmp"
+        preview.save(tmp_path, "JPEG", quality=THUMBNAIL_QUALITY)
+    os.replace(tmp_path, thumb)
+    return thumb
+
+
+def clear_thumbnails(cache_dir: str = THUMBNAIL_DIR) -> None:
+    for thumb in glob.glob(os.path.join(cache_dir, "*.jpg")):
+        os.remove(thumb)
+
+
+def show_previews(
+    paths: typing.Sequence[str],
+    target: str = "jupyter",
+    columns: int = 4,
+    max_width: int = 300,
+    max_height: int = 300,
+) -> None:
+    """Show a grid of cached thumbnails in Jupyter or in a Streamlit page."""
+    # Pillow releases the GIL while decoding, so missing thumbnails build in parallel.
+    with ThreadPoolExecutor() as pool:
+        thumbs = list(pool.map(lambda path: thumbnail_path(path, max_width, max_height), paths))
+    if target == "streamlit":
+        import streamlit as st
+
+        for row_start in range(0, len(thumbs), columns):
+            row = st.columns(columns)
+            for col, path, thumb in zip(row, paths[row_start:row_start + columns], thumbs[row_start:]):
+                col.image(thumb, caption=os.path.basename(path), use_container_width=True)
+    else:
+        import IPython.display
+
+        for thumb in thumbs:
+            IPython.display.display(IPython.display.Image(filename=thumb))
@@ -0,0 +1,155 @@
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+METRICS_PATH = os.environ.get(
+    "LLM_METRICS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "llm_calls.jsonl")
+)
+# Recent calls kept in memory for summary(); the JSONL file has everything.
+HISTORY_SIZE = 10000
+
+_history = collections.deque(maxlen=HISTORY_SIZE)
+_lock = threading.Lock()
+
+
+class CallRecord:
+    """Measurements for one model call, filled in while the call runs."""
+
+    def __init__(self, entry_point, model, variant=None):
+        self.entry_point = entry_point
+        self.model = model
+        self.variant = variant  # prompt template variant, when the caller uses one
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.wall_time = None
+        self.time_to_first_token = None
+        self.input_tokens = None
+        self.output_tokens = None
+        self.cached_tokens = None
+        self.retries = 0
+        self.cache_hit = False
+        self.error = None
+
+    def first_token(self):
+        """Call when the first streamed chunk arrives; later calls are ignored."""
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self._start
+
+    def add_usage(self, message):
+        """Accumulate token counts from a langchain message or stream chunk."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        for field in ("input_tokens", "output_tokens"):
+            if usage.get(field) is not None:
+                setattr(self, field, (getattr(self, field) or 0) + usage[field])
+        # Input tokens the provider served from its context cache.
+        cache_read = (usage.get("input_token_details") or {}).get("cache_read")
+        if cache_read is not None:
+            self.cached_tokens = (self.cached_tokens or 0) + cache_read
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self._start
+        if self.time_to_first_token is None and self.error is None:
+            # Non-streaming calls deliver everything at once.
+            self.time_to_first_token = self.wall_time
+
+    def as_dict(self):
+        return {
+            "ts": self.started_at,
+            "entry_point": self.entry_point,
+            "model": self.model,
+            "variant": self.variant,
+            "wall_time": self.wall_time,
+            "time_to_first_token": self.time_to_first_token,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "retries": self.retries,
+            "cache_hit": self.cache_hit,
+            "error": self.error,
+        }
+
+
+def _write(record):
+    row = record.as_dict()
+    line = json.dumps(row)
+    with _lock:
+        _history.append(row)
+        try:
+            os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+            with open(METRICS_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Failed to write LLM metrics: {e}")
+
+
+@contextlib.contextmanager
+def record_call(entry_point, model, retries=0, variant=None):
+    """Time a model call and log it, whether it succeeds or raises.
+
+        with record_call("quick_query", "gemini-2.0-flash") as call:
+            message = client.invoke(prompt)
+            call.add_usage(message)
+    """
+    record = CallRecord(entry_point, model, variant)
+    record.retries = retries
+    try:
+        yield record
+    except BaseException as e:
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record.finish()
+        _write(record)
+
+
+def record_cache_hit(entry_point, model, variant=None):
+    record = CallRecord(entry_point, model, variant)
+    record.cache_hit = True
+    record.finish()
+    _write(record)
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def summary():
+    """p50/p95 latency and token totals per (model, entry point, prompt variant) for recent calls."""
+    with _lock:
+        rows = list(_history)
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["model"], row["entry_point"], row.get("variant") or ""), []).append(row)
+    result = {}
+    for (model, entry_point, variant), items in sorted(groups.items()):
+        calls = [r for r in items if not r["cache_hit"]]
+        ok = [r for r in calls if r["error"] is None]
+        wall = [r["wall_time"] for r in ok]
+        ttft = [r["time_to_first_token"] for r in ok if r["time_to_first_token"] is not None]
+        name = f"{model} / {entry_point}" + (f" / {variant}" if variant else "")
+        result[name] = {
+            "calls": len(calls),
+            "errors": len(calls) - len(ok),
+            "cache_hits": len(items) - len(calls),
+            "retries": sum(r["retries"] for r in calls),
+            "wall_p50": _percentile(wall, 50),
+            "wall_p95": _percentile(wall, 95),
+            "ttft_p50": _percentile(ttft, 50),
+            "ttft_p95": _percentile(ttft, 95),
+            "input_tokens": sum(r["input_tokens"] or 0 for r in calls),
+            "output_tokens": sum(r["output_tokens"] or 0 for r in calls),
+            "cached_tokens": sum(r.get("cached_tokens") or 0 for r in calls),
+        }
+    return result
+
+
+def print_summary():
+    for name, stats in summary().items():
+        fmt = {k: (f"{v:.2f}s" if isinstance(v, float) else v) for k, v in stats.items()}
+        print(f"{name}: " + ", ".join(f"{k}={v}" for k, v in fmt.items()))
@@ -1,21 +1,245 @@
 import getpass
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from instrumentation import record_call
+from replay_models import replay_enabled
 
-load_dotenv('hack.env')
-if not os.environ.get("GOOGLE_API_KEY"):
-  os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter API key for Google Gemini: ")
+ENV_FILE = 'hack.env'
+DEFAULT_PROVIDER = "google_genai"
 
-from langchain.chat_models import init_chat_model
+# main.py and the CLI talk about "google"; langchain wants "google_genai".
+PROVIDER_ALIASES = {"google": "google_genai", "gemini": "google_genai"}
 
-model = init_chat_model("gemini-2.0-flash", model_provider="google_genai")
+# Quality tiers, lowest first. A request for a tier may be served by any
+# model at that tier or above.
+TIERS = ["fast", "standard", "pro"]
 
-s = model.invoke("write a program for self drving car")
-print(s.content)
+# Static profile per model: expected latency seeds the router before any
+# real measurements exist; cost is USD per 1M input/output tokens.
+AVAILABLE_MODELS = {
+  "google_genai": {
+    "gemini-2.0-flash": {
+      "description": "Fast general model for quick queries",
+      "tier": "fast",
+      "expected_latency": 1.0,
+      "cost_per_1m_input": 0.10,
+      "cost_per_1m_output": 0.40,
+    },
+    "gemini-2.5-flash": {
+      "description": "Balanced speed and quality",
+      "tier": "standard",
+      "expected_latency": 4.0,
+      "cost_per_1m_input": 0.30,
+      "cost_per_1m_output": 2.50,
+    },
+    "gemini-2.5-pro": {
+      "description": "Highest quality; full game generation",
+      "tier": "pro",
+      "expected_latency": 30.0,
+      "cost_per_1m_input": 1.25,
+      "cost_per_1m_output": 10.0,
+    },
+  },
+}
 
+LATENCY_SMOOTHING = 0.3
+ERROR_COOLDOWN = 60.0
+SLOW_FACTOR = 3.0
+
+# Process-wide client registry. Chat models are created on first use and then
+# shared by every caller (Streamlit reruns, worker threads, batch jobs) so
+# nothing touches the network or the API key prompt at import time.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def setup_api_keys(interactive=True):
+  """Load hack.env and, if still missing, prompt for GOOGLE_API_KEY."""
+  load_dotenv(ENV_FILE)
+  if not os.environ.get("GOOGLE_API_KEY") and interactive:
+    os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter API key for Google Gemini: ")
+  return bool(os.environ.get("GOOGLE_API_KEY"))
+
+
+def get_client(model_name, provider=DEFAULT_PROVIDER, **kwargs):
+  """Return the shared chat model for (model_name, provider, kwargs), creating it once."""
+  key = (model_name, provider, tuple(sorted(kwargs.items())))
+  client = _clients.get(key)
+  if client is not None:
+    return client
+  with _clients_lock:
+    client = _clients.get(key)
+    if client is None:
+      if replay_enabled():
+        # Offline recordings with simulated latency; see replay_models.
+        from replay_models import init_chat_model
+      else:
+        setup_api_keys()
+        from langchain.chat_models import init_chat_model
+      client = init_chat_model(model_name, model_provider=provider, **kwargs)
+      _clients[key] = client
+  return client
+
+
+def clear_clients():
+  with _clients_lock:
+    _clients.clear()
+
+
+def normalize_provider(provider):
+  provider = (provider or DEFAULT_PROVIDER).lower()
+  return PROVIDER_ALIASES.get(provider, provider)
 
 
 class llm_engine():
-  
+  """Model registry with latency-aware routing and automatic fallback.
+
+  Every call made through invoke() updates a smoothed latency estimate for
+  the model that served it. route() then picks, for a quality tier, the
+  fastest healthy model at or above that tier; a model that errors or runs
+  far slower than its profile is put on cooldown and tried last until it
+  expires. Lower tiers are only used when a caller opts in with degraded=True.
+  """
+
+  def __init__(self, models=AVAILABLE_MODELS):
+    self.models = models
+    self.current_model = None
+    self.current_provider = DEFAULT_PROVIDER
+    self._stats = {}
+    self._stats_lock = threading.Lock()
+
+  def setup_api_keys(self, interactive=True):
+    return setup_api_keys(interactive)
+
+  def get_model(self, model_name, provider=DEFAULT_PROVIDER, **kwargs):
+    return get_client(model_name, normalize_provider(provider), **kwargs)
+
+  def init_model(self, model_name, provider=DEFAULT_PROVIDER):
+    provider = normalize_provider(provider)
+    if model_name not in self.models.get(provider, {}):
+      print(f"Unknown model {model_name!r} for provider {provider!r}")
+      return False
+    try:
+      self.get_model(model_name, provider)
+    except Exception as e:
+      print(f"Failed to initialize {model_name}: {e}")
+      return False
+    self.current_model = model_name
+    self.current_provider = provider
+    return True
+
+  def list_available_models(self):
+    return self.models
+
+  def get_current_model_info(self):
+    model_name = self.current_model or self.route("fast", self.current_provider)[0]
+    info = {"model_name": model_name, "provider": self.current_provider}
+    info.update(self.models.get(self.current_provider, {}).get(model_name, {}))
+    info.update(self.model_stats(model_name))
+    return info
+
+  def model_stats(self, model_name):
+    with self._stats_lock:
+      return dict(self._stats.get(model_name, {}))
+
+  def _profile(self, model_name, provider=DEFAULT_PROVIDER):
+    return self.models.get(provider, {}).get(model_name, {})
+
+  def _latency(self, model_name, provider):
+    stats = self._stats.get(model_name)
+    if stats and "latency" in stats:
+      return stats["latency"]
+    return self._profile(model_name, provider).get("expected_latency", float("inf"))
+
+  def _is_cooling_down(self, model_name):
+    stats = self._stats.get(model_name)
+    return bool(stats) and stats.get("cooldown_until", 0) > time.monotonic()
+
+  def route(self, tier="fast", provider=DEFAULT_PROVIDER, degraded=False):
+    """Candidate models for `tier`, best first.
+
+    Only models at or above the tier are candidates, healthy ones before ones
+    cooling down, fastest first. With degraded=True, lower-tier models follow,
+    best quality first, for callers that would rather get a worse answer than
+    none while the tier itself is failing.
+    """
+    provider = normalize_provider(provider)
+    min_rank = TIERS.index(tier)
+    models = self.models.get(provider, {})
+    with self._stats_lock:
+      def sort_key(name):
+        rank = TIERS.index(models[name]["tier"])
+        if rank >= min_rank:
+          return (0, self._is_cooling_down(name), self._latency(name, provider))
+        return (1, self._is_cooling_down(name), -rank)
+      candidates = [name for name in models if degraded or TIERS.index(models[name]["tier"]) >= min_rank]
+      return sorted(candidates, key=sort_key)
+
+  def record_latency(self, model_name, seconds, provider=DEFAULT_PROVIDER):
+    expected = self._profile(model_name, provider).get("expected_latency")
+    with self._stats_lock:
+      stats = self._stats.setdefault(model_name, {"calls": 0, "errors": 0})
+      stats["calls"] += 1
+      previous = stats.get("latency")
+      stats["latency"] = seconds if previous is None else (
+        LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * previous
+      )
+      if expected and stats["latency"] > SLOW_FACTOR * expected:
+        stats["cooldown_until"] = time.monotonic() + ERROR_COOLDOWN
+
+  def record_error(self, model_name, error):
+    with self._stats_lock:
+      stats = self._stats.setdefault(model_name, {"calls": 0, "errors": 0})
+      stats["errors"] += 1
+      stats["last_error"] = f"{type(error).__name__}: {error}"
+      stats["cooldown_until"] = time.monotonic() + ERROR_COOLDOWN
+
+  def invoke(self, prompt, tier="fast", provider=DEFAULT_PROVIDER, model_name=None,
+             entry_point="llm_config.invoke", retries=0, variant=None, degraded=False):
+    """Invoke the routed model, falling back down the candidate list on errors.
+
+    Returns (message, model_name). Raises the last error if every candidate
+    fails, so callers can back off and retry; `degraded` is passed to route().
+    Each attempt is logged under `entry_point`; `retries` counts earlier
+    attempts made by the caller, and fallbacks add to it. `variant` names the
+    prompt template variant for per-variant metrics.
+    """
+    provider = normalize_provider(provider)
+    candidates = [model_name] if model_name else self.route(tier, provider, degraded)
+    last_error = None
+    for attempt, name in enumerate(candidates):
+      start = time.perf_counter()
+      try:
+        with record_call(entry_point, name, retries=retries + attempt, variant=variant) as call:
+          message = self.get_model(name, provider).invoke(prompt)
+          call.add_usage(message)
+      except Exception as e:
+        self.record_error(name, e)
+        last_error = e
+        continue
+      self.record_latency(name, time.perf_counter() - start, provider)
+      return message, name
+    raise last_error or RuntimeError(f"No model available for tier {tier!r}")
+
+  def quick_query(self, prompt):
+    """Short answer from the current model, or the fastest `fast` tier model."""
+    try:
+      message, _ = self.invoke(prompt, tier="fast", provider=self.current_provider,
+                               model_name=self.current_model, entry_point="quick_query")
+    except Exception as e:
+      if self.current_model is None:
+        print(f"An error occurred while invoking the model: {e}")
+        return None
+      # An explicitly chosen model failed; let the router pick another one.
+      try:
+        message, _ = self.invoke(prompt, tier="fast", provider=self.current_provider,
+                                 entry_point="quick_query", retries=1)
+      except Exception as e:
+        print(f"An error occurred while invoking the model: {e}")
+        return None
+    return message.content
+
 
-  
\ No newline at end of file
+llm_config = llm_engine()
@@ -5,6 +5,7 @@ Professional entry point for the LLM Configuration System
 """
 
 from llm_config import llm_config
+from instrumentation import print_summary
 
 
 def main():
@@ -69,6 +70,7 @@ def main():
                         print("- 'info': Show current model info")
                         print("- 'models': List available models")
                         print("- 'change <model>': Change to a different model")
+                        print("- 'stats': Show latency and token usage per model")
                         print("- 'quit': Exit interactive mode")
                     elif command.startswith('query '):
                         query = command[6:].strip()
@@ -87,6 +89,8 @@ def main():
                             print(f"\n{provider.upper()}:")
                             for model_name, config in model_list.items():
                                 print(f"  - {model_name}: {config['description']}")
+                    elif command == 'stats':
+                        print_summary()
                     elif command.startswith('change '):
                         model_name = command[7:].strip()
                         if llm_config.init_model(model_name, "google"):
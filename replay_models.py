@@ -0,0 +1,216 @@
+"""Offline stand-ins for the Gemini chat models and the Imagen model.
+
+They replay recorded outputs (the games saved in gamemodule/web_game and
+the scene_*.png images in imagemodule) with simulated latency and failures,
+so the generation stack can be exercised and load-tested without keys or
+network. With REPLAY_MODELS=1 set, llm_config.get_client and
+st_image.get_generation_model build these instead of the real clients, and
+the game cache, game library and image cache move under REPLAY_DATA_DIR so
+recorded results are never served as real ones later.
+"""
+import functools
+import glob
+import hashlib
+import math
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = os.path.join(ROOT, "gamemodule", "web_game")
+SCENE_DIR = os.path.join(ROOT, "imagemodule")
+REPLAY_DATA_DIR = os.environ.get("REPLAY_DATA_DIR", os.path.join(tempfile.gettempdir(), "replay_data"))
+
+# Simulated latency is a model's expected latency times this, so a load test
+# against the 30 s pro model doesn't take 30 s per call.
+TIME_SCALE = float(os.environ.get("REPLAY_TIME_SCALE", "0.05"))
+ERROR_RATE = float(os.environ.get("REPLAY_ERROR_RATE", "0"))
+# Imagen has no entry in llm_config.AVAILABLE_MODELS; this is its typical latency.
+IMAGE_LATENCY = 8.0
+CHUNK_SIZE = 64
+# Worded like the provider's errors, so retry logic (batch_generator.is_retryable)
+# treats them as it would the real thing.
+ERRORS = (
+    "429 Resource has been exhausted (e.g. check quota).",
+    "503 The service is currently unavailable.",
+    "504 Deadline Exceeded",
+)
+
+
+def replay_enabled():
+    return os.environ.get("REPLAY_MODELS", "").lower() not in ("", "0", "false", "no")
+
+
+def data_path(path, name):
+    """`path`, or `name` under REPLAY_DATA_DIR while replay models are on."""
+    return os.path.join(REPLAY_DATA_DIR, name) if replay_enabled() else path
+
+
+class ReplayTiming:
+    """Latency and failure distribution for one simulated model.
+
+    Latency is log-normal with the given median (sigma sets how long the
+    tail is); `first_token` is the fraction of it spent before a stream's
+    first chunk, which is also when failures are raised. Each call fails
+    with probability `error_rate`.
+    """
+
+    def __init__(self, median=1.0, sigma=0.5, first_token=0.2, error_rate=ERROR_RATE, errors=ERRORS, seed=None):
+        self.median = median
+        self.sigma = sigma
+        self.first_token = first_token
+        self.error_rate = error_rate
+        self.errors = errors
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """(latency in seconds, error message or None) for one call."""
+        with self._lock:
+            latency = self._rng.lognormvariate(math.log(self.median), self.sigma) if self.median > 0 else 0.0
+            error = self._rng.choice(self.errors) if self._rng.random() < self.error_rate else None
+        return latency, error
+
+
+class ReplayMessage:
+    """Just enough of a langchain AIMessage / AIMessageChunk: content and usage_metadata."""
+
+    def __init__(self, content, usage_metadata=None):
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+
+@functools.lru_cache(maxsize=None)
+def load_games(game_dir=GAME_DIR):
+    """{slug: html} for every saved game, slug being the file name without _game.html."""
+    games = {}
+    for path in sorted(glob.glob(os.path.join(game_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            games[re.sub(r"(_game)?\.html$", "", os.path.basename(path))] = f.read()
+    return games
+
+
+def load_scenes(scene_dir=SCENE_DIR):
+    return sorted(glob.glob(os.path.join(scene_dir, "scene_*.png")))
+
+
+def _prompt_text(prompt):
+    """Plain text of a str, a list of (role, text) tuples or a list of messages."""
+    if isinstance(prompt, str):
+        return prompt
+    parts = []
+    for message in prompt:
+        parts.append(message[1] if isinstance(message, tuple) else getattr(message, "content", str(message)))
+    return "\n".join(parts)
+
+
+def _pick(items, text):
+    """Same prompt, same recording: choose by a stable hash of the prompt."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return items[int.from_bytes(digest[:4], "big") % len(items)]
+
+
+class ReplayChatModel:
+    """Chat model with invoke() and stream() that answers from recordings.
+
+    Game prompts (anything asking for HTML) get a saved game, the one whose
+    file name matches the topic when there is one; other prompts get a short
+    canned answer. `responses` replaces the saved games.
+    """
+
+    def __init__(self, model_name="replay", responses=None, timing=None):
+        self.model_name = model_name
+        self.responses = responses
+        self.timing = timing or ReplayTiming()
+
+    def _respond(self, prompt):
+        text = _prompt_text(prompt)
+        if self.responses is not None:
+            reply = _pick(self.responses, text)
+        elif "html" in text.lower():
+            games = load_games()
+            topic = re.search(r'Topic: "([^"]*)"', text)
+            slug = re.sub(r"\W+", "_", topic.group(1).lower()).strip("_") if topic else None
+            reply = games.get(slug) or _pick(list(games.values()), text)
+        else:
+            reply = f"[replay {self.model_name}] {text.strip()[:200]}"
+        usage = {"input_tokens": len(text) // 4, "output_tokens": len(reply) // 4, "total_tokens": (len(text) + len(reply)) // 4}
+        return reply, usage
+
+    def invoke(self, prompt, **kwargs):
+        reply, usage = self._respond(prompt)
+        latency, error = self.timing.sample()
+        if error:
+            time.sleep(latency * self.timing.first_token)
+            raise RuntimeError(error)
+        time.sleep(latency)
+        return ReplayMessage(reply, usage)
+
+    def stream(self, prompt, **kwargs):
+        reply, usage = self._respond(prompt)
+        latency, error = self.timing.sample()
+        time.sleep(latency * self.timing.first_token)
+        if error:
+            raise RuntimeError(error)
+        chunks = [reply[i:i + CHUNK_SIZE] for i in range(0, len(reply), CHUNK_SIZE)] or [""]
+        per_chunk = latency * (1 - self.timing.first_token) / len(chunks)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(per_chunk)
+            # Gemini reports usage on the final chunk only.
+            yield ReplayMessage(chunk, usage if i == len(chunks) - 1 else None)
+
+
+def init_chat_model(model_name, model_provider=None, **kwargs):
+    """Drop-in for langchain's init_chat_model, timed from the model's expected latency."""
+    from llm_config import AVAILABLE_MODELS
+
+    profile = AVAILABLE_MODELS.get(model_provider, {}).get(model_name, {})
+    timing = ReplayTiming(median=profile.get("expected_latency", 1.0) * TIME_SCALE)
+    return ReplayChatModel(model_name, timing=timing)
+
+
+class ReplayImage:
+    def __init__(self, path):
+        self.path = path
+
+    def save(self, location, include_generation_parameters=False):
+        shutil.copyfile(self.path, location)
+
+
+class ReplayImageResponse:
+    def __init__(self, images):
+        self.images = images
+
+    def __getitem__(self, index):
+        return self.images[index]
+
+    def __iter__(self):
+        return iter(self.images)
+
+
+class ReplayImageModel:
+    """Stands in for vertexai's ImageGenerationModel, answering with recorded scenes."""
+
+    def __init__(self, model_name="replay", scenes=None, timing=None):
+        self.model_name = model_name
+        self.scenes = load_scenes() if scenes is None else list(scenes)
+        self.timing = timing or ReplayTiming(median=IMAGE_LATENCY * TIME_SCALE)
+
+    @classmethod
+    def from_pretrained(cls, model_name):
+        return cls(model_name)
+
+    def generate_images(self, prompt, number_of_images=1, **kwargs):
+        latency, error = self.timing.sample()
+        if error:
+            time.sleep(latency * self.timing.first_token)
+            raise RuntimeError(error)
+        time.sleep(latency)
+        if not self.scenes:
+            raise RuntimeError(f"No recorded scenes in {SCENE_DIR}")
+        return ReplayImageResponse([ReplayImage(_pick(self.scenes, f"{prompt}#{i}")) for i in range(number_of_images)])
@@ -1,9 +1,12 @@
 import pygame
+import argparse
 import math
+import os
 import random
+import time
 
-# Initialize Pygame
-pygame.init()
+from body_system import BodySystem
+from text_layout import wrap_text
 
 # --- Constants ---
 SCREEN_WIDTH = 1000
@@ -28,46 +31,77 @@ INFO_BORDER_COLOR = (150, 150, 255)
 # Game settings
 ROCKET_SPEED = 4
 FPS = 60
+# While the info box or the end screen is up nothing moves, so the loop only
+# wakes this often to poll for input.
+IDLE_FPS = 10
 
-# --- Setup Screen and Clock ---
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Planet Surface Explorer")
-clock = pygame.time.Clock()
+# Headless runs
+HEADLESS_FRAMES = 3000
+HEADLESS_SEED = 0
 
-# --- Fonts ---
-try:
-    FONT_SMALL = pygame.font.SysFont('Arial', 16)
-    FONT_MEDIUM = pygame.font.SysFont('Arial', 24)
-    FONT_LARGE = pygame.font.SysFont('Arial', 48)
-except pygame.error:
-    FONT_SMALL = pygame.font.Font(None, 20)
-    FONT_MEDIUM = pygame.font.Font(None, 30)
-    FONT_LARGE = pygame.font.Font(None, 54)
+# --- Setup Screen, Clock and Fonts ---
+# Filled in by setup_display() so importing this module opens no window.
+screen = None
+clock = None
+FONT_SMALL = FONT_MEDIUM = FONT_LARGE = None
 
+def setup_display(headless=False):
+    """Open the game window, or an offscreen one on SDL's dummy driver."""
+    global screen, clock, FONT_SMALL, FONT_MEDIUM, FONT_LARGE
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Planet Surface Explorer")
+    clock = pygame.time.Clock()
+
+    try:
+        FONT_SMALL = pygame.font.SysFont('Arial', 16)
+        FONT_MEDIUM = pygame.font.SysFont('Arial', 24)
+        FONT_LARGE = pygame.font.SysFont('Arial', 48)
+    except pygame.error:
+        FONT_SMALL = pygame.font.Font(None, 20)
+        FONT_MEDIUM = pygame.font.Font(None, 30)
+        FONT_LARGE = pygame.font.Font(None, 54)
+
+
+# --- Render Caches ---
+# Rendered text surfaces keyed by (text, font, color). Labels never change, so
+# after the first frame every draw_text call is a dict lookup and a blit.
+TEXT_CACHE_SIZE = 256
+_text_cache = {}
+
+def render_text(text, font, color):
+    key = (text, font, color)
+    surface = _text_cache.get(key)
+    if surface is None:
+        if len(_text_cache) >= TEXT_CACHE_SIZE:
+            _text_cache.pop(next(iter(_text_cache)))
+        surface = font.render(text, 1, color)
+        _text_cache[key] = surface
+    return surface
+
+def build_background(stars, planets):
+    """Stars, sun and orbit rings never move: draw them once onto one surface."""
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill(BLACK)
+    for star in stars:
+        pygame.draw.circle(background, WHITE, star, 1)
+    pygame.draw.circle(background, YELLOW, (CENTER_X, CENTER_Y), 30)
+    for planet in planets:
+        pygame.draw.circle(background, (50, 50, 50), (CENTER_X, CENTER_Y), planet.orbit_radius, 1)
+    return background
 
 # --- Helper Functions ---
 def draw_text(text, font, color, surface, x, y, center=False):
-    textobj = font.render(text, 1, color)
+    textobj = render_text(text, font, color)
     textrect = textobj.get_rect()
     if center:
         textrect.center = (x, y)
     else:
         textrect.topleft = (x, y)
-    surface.blit(textobj, textrect)
-
-def wrap_text(text, font, max_width):
-    words = text.split(' ')
-    lines = []
-    current_line = ""
-    for word in words:
-        test_line = current_line + word + " "
-        if font.size(test_line)[0] < max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word + " "
-    lines.append(current_line)
-    return lines
+    return surface.blit(textobj, textrect)
 
 # --- Game Classes ---
 class Rocket(pygame.sprite.Sprite):
@@ -78,11 +112,11 @@ class Rocket(pygame.sprite.Sprite):
         pygame.draw.polygon(self.image, WHITE, [(15, 0), (0, 40), (30, 40)]) # Main body
         pygame.draw.polygon(self.image, RED, [(15, 25), (5, 40), (25, 40)]) # Flame
         self.rect = self.image.get_rect(center=(50, SCREEN_HEIGHT // 2))
+        self.radius = math.hypot(*self.rect.size) / 2  # what collide_circle used for a sprite without one
         self.speed_x = 0
         self.speed_y = 0
 
-    def update(self):
-        keys = pygame.key.get_pressed()
+    def update(self, keys):
         self.speed_x = 0
         self.speed_y = 0
 
@@ -109,8 +143,9 @@ class Rocket(pygame.sprite.Sprite):
             self.rect.bottom = SCREEN_HEIGHT
 
 class Planet(pygame.sprite.Sprite):
-    def __init__(self, name, color, radius, orbit_radius, orbit_speed, description):
+    def __init__(self, index, name, color, radius, orbit_radius, orbit_speed, description):
         super().__init__()
+        self.index = index  # row in the BodySystem arrays
         self.name = name
         self.color = color
         self.radius = radius
@@ -118,7 +153,6 @@ class Planet(pygame.sprite.Sprite):
         self.orbit_speed = orbit_speed
         self.description = description
         
-        self.angle = random.uniform(0, 2 * math.pi)
         self.image = pygame.Surface((self.radius * 2 + 10, self.radius * 2 + 10), pygame.SRCALPHA)
         self.image_center = (self.image.get_width() // 2, self.image.get_height() // 2)
         
@@ -129,18 +163,70 @@ class Planet(pygame.sprite.Sprite):
 
         self.rect = self.image.get_rect()
         self.visited = False
-        self.update()
 
-    def update(self):
-        self.angle += self.orbit_speed
-        self.rect.centerx = int(CENTER_X + self.orbit_radius * math.cos(self.angle))
-        self.rect.centery = int(CENTER_Y + self.orbit_radius * math.sin(self.angle))
+    def update(self, positions):
+        self.rect.center = positions[self.index]
 
     def draw(self, surface):
-        surface.blit(self.image, self.rect)
-        pygame.draw.circle(surface, (50, 50, 50), (CENTER_X, CENTER_Y), self.orbit_radius, 1)
+        """Blit the planet and its label; returns the screen area touched."""
+        area = surface.blit(self.image, self.rect)
         if not self.visited:
-            draw_text(self.name, FONT_SMALL, WHITE, surface, self.rect.centerx, self.rect.bottom + 5, center=True)
+            area = area.union(draw_text(self.name, FONT_SMALL, WHITE, surface, self.rect.centerx, self.rect.bottom + 5, center=True))
+        return area
+
+# --- Scripted Input ---
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed() when input comes from a script."""
+
+    def __init__(self):
+        self.held = set()
+
+    def __getitem__(self, key):
+        return key in self.held
+
+def demo_script(frames):
+    """Input for headless runs as (frame, key, pressed) steps: fly a box
+    around the screen, tap space to close info boxes and R to replay."""
+    script = []
+    moves = [pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP]
+    for i, start in enumerate(range(0, frames, 120)):
+        key = moves[i % len(moves)]
+        script += [(start, key, True), (start + 119, key, False)]
+    for start in range(60, frames, 90):
+        script += [(start, pygame.K_SPACE, True), (start + 1, pygame.K_SPACE, False)]
+    for start in range(600, frames, 600):
+        script += [(start, pygame.K_r, True), (start + 1, pygame.K_r, False)]
+    return script
+
+class PhaseTimer:
+    """Wall time of each phase of every frame, for headless benchmarks."""
+    PHASES = ("events", "update", "collision", "draw")
+
+    def __init__(self):
+        self.samples = {phase: [] for phase in self.PHASES}
+        self._last = None
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.samples[phase].append(now - self._last)
+        self._last = now
+
+    def report(self):
+        result = {}
+        for phase, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[phase] = {
+                "frames": len(samples),
+                "total_ms": sum(samples) * 1000,
+                "mean_ms": sum(samples) / len(samples) * 1000,
+                "p95_ms": ordered[round(0.95 * (len(ordered) - 1))] * 1000,
+            }
+        return result
 
 # --- Game State Setup ---
 def game_setup():
@@ -161,73 +247,143 @@ def game_setup():
     ]
 
     planets = pygame.sprite.Group()
-    for p_data in planets_data:
-        planet = Planet(p_data["name"], p_data["color"], p_data["radius"], p_data["orbit"], p_data["speed"], p_data["desc"])
+    for i, p_data in enumerate(planets_data):
+        planet = Planet(i, p_data["name"], p_data["color"], p_data["radius"], p_data["orbit"], p_data["speed"], p_data["desc"])
         planets.add(planet)
+
+    # Orbits live in arrays so the same loop scales to asteroid belts and moon systems.
+    bodies = BodySystem(
+        (CENTER_X, CENTER_Y),
+        orbit_radius=[p["orbit"] for p in planets_data],
+        speed=[p["speed"] for p in planets_data],
+        radius=[p["radius"] for p in planets_data],
+        angle=[random.uniform(0, 2 * math.pi) for _ in planets_data],
+    )
+    bodies.step()
+    planets.update(bodies.pixel_positions())
     
     stars = [(random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT)) for _ in range(200)]
+    background = build_background(stars, planets)
     
-    return rocket, all_sprites, planets, stars
+    return rocket, all_sprites, planets, bodies, background
 
 # --- Main Game Loop ---
-def main():
-    rocket, all_sprites, planets, stars = game_setup()
-    
-    visited_planets_count = 0
-    game_over = False
+def main(dirty_rects=False, headless=False, frames=None, seed=None, script=None):
+    """Run the game and return its PhaseTimer.
+
+    With dirty_rects, each frame repaints and pushes to the display only the
+    areas that changed instead of the whole window. Headless runs use SDL's
+    dummy driver and advance one fixed step per frame with no clock.tick, so
+    a seeded run replaying `script` (default: demo_script) is repeatable.
+    """
+    if headless:
+        frames = frames or HEADLESS_FRAMES
+        seed = HEADLESS_SEED if seed is None else seed
+        script = demo_script(frames) if script is None else script
+    if seed is not None:
+        random.seed(seed)
+    setup_display(headless)
+
+    keys = ScriptedKeys() if script is not None else None
+    script_events = {}
+    for frame, key, pressed in script or []:
+        script_events.setdefault(frame, []).append((key, pressed))
+    timer = PhaseTimer()
+
+    frame = 0
     running = True
-    show_info = False
-    info_text_lines = []
-    info_planet_name = ""
-    
-    while running:
+    restart = True
+    while running and (frames is None or frame < frames):
+        if restart:
+            rocket, all_sprites, planets, bodies, background = game_setup()
+            planet_list = list(planets)
+            visited_planets_count = 0
+            game_over = False
+            show_info = False
+            info_text_lines = []
+            info_planet_name = ""
+            # The only text that changes during play: re-rendered when the count does.
+            scoreboard = None
+            scoreboard_count = None
+            # Areas drawn last frame; in dirty-rect mode they are restored from the
+            # background before the next frame is drawn.
+            dirty = []
+            redraw_all = True
+            restart = False
+
+        timer.start()
         # --- Event Handling ---
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        for key, pressed in script_events.get(frame, ()):
+            (keys.held.add if pressed else keys.held.discard)(key)
+            events.append(pygame.event.Event(pygame.KEYDOWN if pressed else pygame.KEYUP, key=key))
+        frame += 1
+
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            if event.type == pygame.VIDEOEXPOSE:
+                redraw_all = True
             if event.type == pygame.KEYDOWN:
                 if show_info:
                     show_info = False # Close info box on any key press
+                    redraw_all = True
                 if game_over and event.key == pygame.K_r:
-                    main() # Restart the game
-                    return
+                    restart = True # Start over on the next frame
                 if event.key == pygame.K_ESCAPE:
                     running = False
+        timer.mark("events")
+        if restart:
+            continue
 
         # --- Game Logic ---
         if not show_info and not game_over:
-            rocket.update()
-            planets.update()
+            rocket.update(keys if keys is not None else pygame.key.get_pressed())
+            bodies.step()
+            planets.update(bodies.pixel_positions())
+            timer.mark("update")
 
             # Collision detection
-            collided_planets = pygame.sprite.spritecollide(rocket, planets, False, pygame.sprite.collide_circle)
-            for planet in collided_planets:
+            hits = bodies.collide(rocket.rect.centerx, rocket.rect.centery, rocket.radius)
+            for planet in (planet_list[i] for i in hits):
                 if not planet.visited:
                     planet.visited = True
                     visited_planets_count += 1
                     show_info = True
+                    redraw_all = True
                     info_planet_name = planet.name
                     info_text_lines = wrap_text(planet.description, FONT_MEDIUM, SCREEN_WIDTH - 150)
                     
             if visited_planets_count >= len(planets):
                 game_over = True
+                redraw_all = True
+            timer.mark("collision")
 
+        # A paused screen looks the same every frame: don't redraw it, just
+        # keep polling for input at a low rate.
+        idle = show_info or game_over
+        if idle and not redraw_all:
+            if not headless:
+                clock.tick(IDLE_FPS)
+            continue
         # --- Drawing ---
-        screen.fill(BLACK)
-        for star in stars:
-            pygame.draw.circle(screen, WHITE, star, 1)
-
-        pygame.draw.circle(screen, YELLOW, (CENTER_X, CENTER_Y), 30)
+        full_frame = redraw_all or not dirty_rects
+        if full_frame:
+            screen.blit(background, (0, 0))
+        else:
+            for rect in dirty:
+                screen.blit(background, rect, rect)
         
-        planets.draw(screen)
-        for p in planets:
-            p.draw(screen)
-        screen.blit(rocket.image, rocket.rect)
+        drawn = [p.draw(screen) for p in planets]
+        drawn.append(screen.blit(rocket.image, rocket.rect))
 
         # UI
-        draw_text("Planet Surface Explorer", FONT_MEDIUM, WHITE, screen, 20, 10)
-        draw_text("Use Arrow Keys to fly. Visit all planets!", FONT_SMALL, WHITE, screen, 20, 40)
-        draw_text(f"Planets Visited: {visited_planets_count} / {len(planets)}", FONT_MEDIUM, WHITE, screen, SCREEN_WIDTH - 250, 10)
+        drawn.append(draw_text("Planet Surface Explorer", FONT_MEDIUM, WHITE, screen, 20, 10))
+        drawn.append(draw_text("Use Arrow Keys to fly. Visit all planets!", FONT_SMALL, WHITE, screen, 20, 40))
+        if scoreboard_count != visited_planets_count:
+            scoreboard = FONT_MEDIUM.render(f"Planets Visited: {visited_planets_count} / {len(planets)}", 1, WHITE)
+            scoreboard_count = visited_planets_count
+        drawn.append(screen.blit(scoreboard, (SCREEN_WIDTH - 250, 10)))
 
         # Info Box Display
         if show_info:
@@ -250,10 +406,31 @@ def main():
             draw_text("You have learned about all the planets!", FONT_MEDIUM, WHITE, screen, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 10, center=True)
             draw_text("Press 'R' to play again or ESC to quit.", FONT_MEDIUM, WHITE, screen, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 50, center=True)
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        if full_frame:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty + drawn)
+        dirty = drawn
+        redraw_all = False
+        timer.mark("draw")
+        if not headless:
+            clock.tick(IDLE_FPS if idle else FPS)
 
     pygame.quit()
+    return timer
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Planet Surface Explorer")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="repaint only the areas that changed each frame")
+    parser.add_argument("--headless", action="store_true",
+                        help="run a scripted, seeded game offscreen as fast as possible and print phase timings")
+    parser.add_argument("--frames", type=int, default=None,
+                        help=f"frames to run (default: until quit, or {HEADLESS_FRAMES} when headless)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    timer = main(dirty_rects=args.dirty_rects, headless=args.headless, frames=args.frames, seed=args.seed)
+    if args.headless:
+        for phase, stats in timer.report().items():
+            print(f"{phase:<10} frames {stats['frames']:>6}  total {stats['total_ms']:>9.1f}ms  "
+                  f"mean {stats['mean_ms']:.3f}ms  p95 {stats['p95_ms']:.3f}ms")
\ No newline at end of file
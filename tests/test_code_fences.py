@@ -0,0 +1,40 @@
+"""FencedOutputExtractor on raw, fenced and prose-wrapped model replies."""
+from gamemodule.code_fences import FencedOutputExtractor, remove_code_fences
+
+GAME = "<!DOCTYPE html>\n<html>\n<body>\n<canvas id=\"c\"></canvas>\n<script>\nlet score = 0;\n\n  score += 1;\n</script>\n</body>\n</html>\n"
+
+
+def extract(chunks):
+    extractor = FencedOutputExtractor()
+    streamed = "".join(extractor.feed(chunk) for chunk in chunks) + extractor.flush()
+    return streamed, extractor.finish()
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_raw_html_streams_unchanged():
+    streamed, final = extract(chunked(GAME, 7))
+    assert streamed == final == GAME
+
+
+def test_fenced_block_drops_prose_and_fences():
+    reply = "Here is your game:\n\n```html\n" + GAME + "```\nHave fun!\n"
+    streamed, final = extract(chunked(reply, 5))
+    assert streamed == final == GAME
+
+
+def test_fence_split_across_chunks():
+    reply = "```html\n" + GAME + "```\n"
+    for size in (1, 2, 3, 4):
+        assert extract(chunked(reply, size)) == (GAME, GAME)
+
+
+def test_largest_html_block_wins():
+    reply = "```css\nbody { margin: 0; }\n```\n```html\n<p>hi</p>\n```\n```html\n" + GAME + "```\n"
+    assert extract([reply])[1] == GAME
+
+
+def test_unterminated_fence_keeps_what_arrived():
+    assert remove_code_fences("```html\n<html>\n<body>") == "<html>\n<body>"
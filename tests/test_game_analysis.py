@@ -0,0 +1,125 @@
+"""Static checks run on every generated game, and the minify stage."""
+from gamemodule.game_analysis import analyze_game, minify_html, needs_fix
+
+
+def page(js):
+    return f"<!DOCTYPE html>\n<html>\n<body>\n<canvas id=\"c\"></canvas>\n<script>\n{js}\n</script>\n</body>\n</html>\n"
+
+
+def findings(js, rule):
+    return [(f["severity"], f["line"]) for f in analyze_game(page(js))["findings"] if f["rule"] == rule]
+
+
+def test_global_array_grown_every_frame_is_a_warning():
+    js = """let trail = [];
+function loop() {
+  trail.push({x: 1, y: 2});
+  requestAnimationFrame(loop);
+}
+requestAnimationFrame(loop);"""
+    assert findings(js, "unbounded-array") == [("warning", 8)]
+
+
+def test_object_array_grown_from_a_method_the_loop_calls_is_a_warning():
+    js = """class Game {
+  constructor() { this.sparks = []; }
+  update() { this.sparks.push(1); }
+}
+const game = new Game();
+function loop() {
+  game.update();
+  requestAnimationFrame(loop);
+}"""
+    # update() is one call away from the loop, so its body counts as per-frame.
+    assert findings(js, "unbounded-array") == [("warning", 8)]
+
+
+def test_local_array_is_only_info():
+    js = """function nextQuestion(answer) {
+  const options = [];
+  for (let i = 0; i < 4; i++) {
+    options.push(answer + i);
+  }
+  return options;
+}
+function loop() {
+  nextQuestion(3);
+  requestAnimationFrame(loop);
+}"""
+    assert findings(js, "unbounded-array") == [("info", 9)]
+    assert not needs_fix(analyze_game(page(js)))
+
+
+def test_global_array_pushed_outside_the_loop_is_only_info():
+    js = """let scores = [];
+function gameOver(score) { scores.push(score); }"""
+    assert findings(js, "unbounded-array") == [("info", 7)]
+
+
+def test_declaration_and_comparison_do_not_bound_an_array():
+    js = """let trail = [];
+function loop() {
+  if (trail === null || trail == undefined) return;
+  trail.push(1);
+  requestAnimationFrame(loop);
+}"""
+    assert findings(js, "unbounded-array") == [("warning", 9)]
+
+
+def test_trimmed_or_reset_arrays_are_not_flagged():
+    for trim in ("trail.shift();", "trail = trail.filter(p => p.alive);", "trail.length = 0;", "trail = [];"):
+        js = f"""let trail = [];
+function loop() {{
+  trail.push(1);
+  {trim}
+  requestAnimationFrame(loop);
+}}"""
+        assert findings(js, "unbounded-array") == [], trim
+
+
+def test_fast_set_interval_is_flagged():
+    assert findings("setInterval(function () { draw(); }, 16);", "setinterval-animation") == [("warning", 6)]
+    assert findings("setInterval(draw, 1000 / 60);", "setinterval-animation") == []
+
+
+def test_set_interval_reads_its_own_delay_not_a_nested_call():
+    js = """setInterval(function () {
+  x = Math.max(0, 5);
+  drawTimer(x, 10);
+}, 1000);"""
+    assert findings(js, "setinterval-animation") == []
+    assert findings("setInterval(() => tick(Math.min(a, 2)), 20);", "setinterval-animation") == [("warning", 6)]
+
+
+def test_minify_drops_comments_and_blank_lines_outside_scripts():
+    code = "<html>   \n  <!-- a\ncomment -->\n\n  <body>\n  </body>\n</html>\n"
+    assert minify_html(code) == "<html>\n  <body>\n  </body>\n</html>\n"
+    assert minify_html(code, strip_indent=True) == "<html>\n<body>\n</body>\n</html>\n"
+
+
+def test_minify_leaves_scripts_untouched():
+    # A lone backtick inside a quoted string used to throw off template-literal tracking.
+    script = (
+        "<script>\n"
+        "      const q = \"it's `\";\n"
+        "      const t = `first\n"
+        "\n"
+        "        second`;   \n"
+        "      // <!-- not an html comment -->\n"
+        "    </script>"
+    )
+    code = f"<html>\n  <body>\n    {script}\n  </body>\n</html>\n"
+    assert minify_html(code) == code
+    assert script in minify_html(code, strip_indent=True)
+
+
+def test_minify_leaves_pre_and_textarea_untouched():
+    code = "<body>\n<pre>\n  one\n\n    two\n</pre>\n<textarea>\n  a\n\nb</textarea>\n</body>"
+    assert minify_html(code, strip_indent=True) == code
+
+
+def test_minify_is_idempotent_on_a_whole_game():
+    code = page("let trail = [];\n\n  trail.push(1);   ")
+    once = minify_html(code, strip_indent=True)
+    assert minify_html(once, strip_indent=True) == once
+    assert "\n\n  trail.push(1);   \n" in once
@@ -0,0 +1,76 @@
+"""GameCache expiry and LRU eviction, on a temp directory."""
+import json
+import os
+import time
+
+from gamemodule.game_cache import GameCache, cache_key
+
+
+def age_entry(cache, key, seconds):
+    """Pretend the entry was written `seconds` ago, without touching its LRU mtime."""
+    meta_path = os.path.join(cache.cache_dir, key + ".json")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["created_at"] -= seconds
+    mtime = os.path.getmtime(meta_path)
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    os.utime(meta_path, (mtime, mtime))
+
+
+def test_round_trip_and_topic_normalization(tmp_path):
+    cache = GameCache(str(tmp_path))
+    cache.put("Waste Management", "v4/grade5/any", "model", "<html>")
+    assert cache.get("waste  management!", "v4/grade5/any", "model") == "<html>"
+    assert cache.get("waste management", "v4/grade6/any", "model") is None
+    assert cache.get("waste management", "v4/grade5/any", "other") is None
+
+
+def test_hits_do_not_extend_expiry(tmp_path):
+    cache = GameCache(str(tmp_path), max_age=100)
+    cache.put("tides", "v", "m", "code")
+    age_entry(cache, cache_key("tides", "v", "m"), 90)
+    assert cache.get("tides", "v", "m") == "code"  # touches the LRU mtime
+    age_entry(cache, cache_key("tides", "v", "m"), 20)
+    assert cache.get("tides", "v", "m") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_evict_drops_expired_entries_even_if_recently_used(tmp_path):
+    cache = GameCache(str(tmp_path), max_age=100)
+    cache.put("tides", "v", "m", "code")
+    age_entry(cache, cache_key("tides", "v", "m"), 200)
+    cache.evict()
+    assert os.listdir(tmp_path) == []
+
+
+def test_evict_removes_least_recently_used_first(tmp_path):
+    cache = GameCache(str(tmp_path), max_bytes=None)
+    for topic in ("a", "b", "c"):
+        cache.put(topic, "v", "m", "x" * 1000)
+    for age, topic in ((300, "a"), (200, "b"), (100, "c")):
+        used = time.time() - age
+        for ext in (".html", ".json"):
+            os.utime(os.path.join(str(tmp_path), cache_key(topic, "v", "m") + ext), (used, used))
+    assert cache.get("a", "v", "m") is not None  # now the most recently used
+    entry = sum(os.path.getsize(os.path.join(str(tmp_path), name)) for name in os.listdir(tmp_path)) // 3
+    cache.max_bytes = 2 * entry + 10
+    cache.evict()
+    assert [cache.get(t, "v", "m") is not None for t in ("a", "b", "c")] == [True, False, True]
+
+
+def test_corrupt_metadata_is_a_miss_and_gets_evicted(tmp_path):
+    cache = GameCache(str(tmp_path))
+    cache.put("tides", "v", "m", "code")
+    with open(os.path.join(str(tmp_path), cache_key("tides", "v", "m") + ".json"), "w") as f:
+        f.write("{")
+    assert cache.get("tides", "v", "m") is None
+    cache.evict()
+    assert os.listdir(tmp_path) == []
+
+
+def test_invalidate(tmp_path):
+    cache = GameCache(str(tmp_path))
+    cache.put("tides", "v", "m", "code")
+    cache.invalidate("tides", "v", "m")
+    assert cache.get("tides", "v", "m") is None
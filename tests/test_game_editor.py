@@ -0,0 +1,35 @@
+"""Applying SEARCH/REPLACE patches to saved games."""
+import pytest
+
+pytest.importorskip("dotenv")  # game_editor imports llm_config
+
+from gamemodule.game_editor import PatchError, apply_edit_blocks, parse_edit_blocks, validate_edit
+
+GAME = "<!DOCTYPE html>\n<html>\n<body>\n<canvas></canvas>\n<script>\nlet score = 0;\n  score += 1;\n</script>\n</body>\n</html>\n"
+
+
+def test_apply_edit_blocks():
+    code = apply_edit_blocks(GAME, [("let score = 0;\n", "let score = 10;\n")])
+    assert code == GAME.replace("score = 0", "score = 10")
+    # SEARCH indented differently from the file still applies when the lines are unique.
+    loose = apply_edit_blocks(GAME, [("    score += 1;\n", "  score += 5;\n")])
+    assert loose == GAME.replace("score += 1", "score += 5")
+
+
+def test_apply_edit_blocks_rejects_missing_or_ambiguous_search():
+    with pytest.raises(PatchError):
+        apply_edit_blocks(GAME, [])
+    with pytest.raises(PatchError, match="not found"):
+        apply_edit_blocks(GAME, [("let lives = 3;", "let lives = 5;")])
+    with pytest.raises(PatchError, match="occurs 2 times"):
+        apply_edit_blocks(GAME, [("score", "points")])
+
+
+def test_parse_edit_blocks_ignores_fences_and_prose():
+    reply = "Sure:\n```\n<<<<<<< SEARCH\nlet score = 0;\n=======\nlet score = 1;\n>>>>>>> REPLACE\n```\n"
+    assert parse_edit_blocks(reply) == [("let score = 0;\n", "let score = 1;\n")]
+
+
+def test_validate_edit_catches_broken_structure():
+    assert validate_edit(GAME, GAME.replace("</script>", "")) != []
+    assert validate_edit(GAME, GAME.replace("score = 0", "score = 1")) == []
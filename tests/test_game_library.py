@@ -0,0 +1,68 @@
+"""GameLibrary indexing, search and edit history, on a temp directory and database."""
+import os
+
+import pytest
+
+from gamemodule.game_library import GameLibrary, apply_line_delta, line_delta
+
+GAME = "<!DOCTYPE html>\n<html>\n<body>\n<canvas></canvas>\n<script>\nlet score = 0;\n  score += 1;\n</script>\n</body>\n</html>\n"
+
+
+@pytest.fixture
+def library(tmp_path):
+    lib = GameLibrary(str(tmp_path / "web_game"), str(tmp_path / "library.sqlite3"))
+    yield lib
+    lib.close()
+
+
+def test_line_delta_round_trips():
+    old = "a\nb\nc\nd\n"
+    new = "a\nB\nc\nd\ne\n"
+    assert apply_line_delta(old, line_delta(old, new)) == new
+    assert line_delta(old, old) == []
+
+
+def test_load_version_rebuilds_every_version(library):
+    path = library.save_game(GAME, "volcanoes")
+    first = GAME.replace("score = 0", "score = 10")
+    edits = [first, first.replace("+= 1", "+= 2")]
+    for n, code in enumerate(edits):
+        library.save_version(path, code, f"edit {n}")
+    history = library.versions(path)
+    assert [v["version"] for v in history] == [1, 2, 3]
+    assert [v["full_copy"] for v in history] == [1, 0, 0]
+    assert [library.load_version(path, v) for v in (1, 2, 3)] == [GAME] + edits
+    assert library.load(path) == edits[-1]
+    with pytest.raises(KeyError):
+        library.load_version(path, 4)
+
+
+def test_regenerated_file_gets_a_new_full_copy(library):
+    path = library.save_game(GAME, "volcanoes")
+    library.save_version(path, GAME + "<!-- edit -->\n", "edit")
+    regenerated = GAME.replace("<canvas>", "<canvas class=\"new\">")
+    library.save_game(regenerated, "volcanoes")
+    library.save_version(path, regenerated + "<!-- again -->\n", "again")
+    assert [v["full_copy"] for v in library.versions(path)] == [1, 0, 1, 0]
+    assert library.load_version(path, 3) == regenerated
+
+
+def test_long_topic_gets_a_short_unique_file_name(library):
+    topic = "the water cycle and " * 30
+    path = library.save_game(GAME, topic, variant="grade12_simulation")
+    other = library.save_game(GAME, topic + "clouds", variant="grade12_simulation")
+    assert path != other
+    assert len(os.path.basename(path)) < 150
+    assert library.find(topic)["path"] == path
+
+
+def test_topic_owning_a_name_keeps_it(library):
+    first = library.save_game(GAME, "Fractions!")
+    second = library.save_game(GAME, "fractions?")
+    assert first == second  # same normalized topic
+    assert library.path_for("fractions") == first
+
+
+def test_long_non_ascii_topic_fits_in_a_file_name(library):
+    path = library.save_game(GAME, "水循环 " * 100)
+    assert len(os.path.basename(path).encode("utf-8")) < 150
@@ -0,0 +1,62 @@
+"""GameJobQueue coalescing, on replay chat models and a temp library."""
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+import llm_config
+from gamemodule.game_library import GameLibrary
+from gamemodule.job_queue import GameJobQueue
+from replay_models import ReplayChatModel, ReplayTiming
+
+GAME = "<!DOCTYPE html>\n<html>\n<body>\n<canvas></canvas>\n<script>\nlet score = 0;\n</script>\n</body>\n</html>\n"
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    # Slow enough that a second submit arrives while the first job is in flight.
+    clients = {
+        (name, llm_config.DEFAULT_PROVIDER, ()): ReplayChatModel(name, responses=[GAME], timing=ReplayTiming(median=0.3, sigma=0.01))
+        for name in llm_config.AVAILABLE_MODELS[llm_config.DEFAULT_PROVIDER]
+    }
+    monkeypatch.setattr(llm_config, "_clients", clients)
+    library = GameLibrary(str(tmp_path / "web_game"), str(tmp_path / "library.sqlite3"))
+    yield GameJobQueue(max_workers=4, library=library)
+    library.close()
+
+
+def wait(queue, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not queue.get(job_id).finished:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.02)
+    return queue.get(job_id)
+
+
+def test_same_topic_and_variant_share_one_job(queue):
+    first = queue.submit("Volcanoes", grade=3)
+    assert queue.submit("volcanoes!", grade=3) == first
+    assert queue.submit("volcanoes", grade=4) != first
+    job = wait(queue, first)
+    assert job.status == "done", job.error
+    assert job.subscribers == 2
+    assert job.code == GAME
+
+
+def test_refresh_is_never_answered_by_a_plain_job(queue):
+    plain = queue.submit("tides", refresh=False)
+    fresh = queue.submit("tides", refresh=True)
+    assert fresh != plain
+    assert queue.submit("tides", refresh=True) == fresh
+
+
+def test_plain_request_joins_a_refresh_in_flight(queue):
+    fresh = queue.submit("moons", refresh=True)
+    assert queue.submit("moons") == fresh
+
+
+def test_finished_job_is_not_joined(queue):
+    first = queue.submit("comets", refresh=True)
+    wait(queue, first)
+    assert queue.submit("comets", refresh=True) != first
@@ -0,0 +1,81 @@
+"""Tier routing and fallback in llm_engine, with stand-in clients."""
+import pytest
+
+pytest.importorskip("dotenv")
+
+import llm_config
+from llm_config import AVAILABLE_MODELS, DEFAULT_PROVIDER, llm_engine
+from replay_models import ReplayChatModel, ReplayTiming
+
+MODELS = list(AVAILABLE_MODELS[DEFAULT_PROVIDER])
+
+
+class FailingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """{model_name: client} registered with llm_config, each answering with its own name."""
+    registered = {name: ReplayChatModel(name, responses=[name], timing=ReplayTiming(median=0)) for name in MODELS}
+    monkeypatch.setattr(llm_config, "_clients", {(name, DEFAULT_PROVIDER, ()): c for name, c in registered.items()})
+    return registered
+
+
+def use(clients, name, client):
+    clients[name] = client
+    llm_config._clients[(name, DEFAULT_PROVIDER, ())] = client
+
+
+def test_route_stays_at_or_above_the_tier():
+    engine = llm_engine()
+    assert engine.route("pro") == ["gemini-2.5-pro"]
+    assert engine.route("standard") == ["gemini-2.5-flash", "gemini-2.5-pro"]
+    assert engine.route("fast")[0] == "gemini-2.0-flash"
+
+
+def test_degraded_route_appends_lower_tiers_best_first():
+    assert llm_engine().route("pro", degraded=True) == ["gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.0-flash"]
+
+
+def test_route_prefers_the_measured_faster_model():
+    engine = llm_engine()
+    engine.record_latency("gemini-2.5-pro", 1.0)
+    assert engine.route("standard") == ["gemini-2.5-pro", "gemini-2.5-flash"]
+
+
+def test_cooling_down_model_is_tried_last_but_not_dropped():
+    engine = llm_engine()
+    engine.record_error("gemini-2.5-flash", RuntimeError("503"))
+    assert engine.route("standard") == ["gemini-2.5-pro", "gemini-2.5-flash"]
+    engine.record_error("gemini-2.5-pro", RuntimeError("503"))
+    assert engine.route("pro") == ["gemini-2.5-pro"]
+
+
+def test_pro_failure_raises_instead_of_downgrading(clients):
+    engine = llm_engine()
+    failing = FailingModel()
+    use(clients, "gemini-2.5-pro", failing)
+    with pytest.raises(RuntimeError, match="429"):
+        engine.invoke("prompt", tier="pro")
+    assert failing.calls == 1
+    assert engine.model_stats("gemini-2.5-pro")["errors"] == 1
+
+
+def test_degraded_invoke_falls_back_to_a_lower_tier(clients):
+    engine = llm_engine()
+    use(clients, "gemini-2.5-pro", FailingModel())
+    message, name = engine.invoke("prompt", tier="pro", degraded=True)
+    assert name == message.content == "gemini-2.5-flash"
+
+
+def test_invoke_falls_back_within_the_tier(clients):
+    engine = llm_engine()
+    use(clients, "gemini-2.5-flash", FailingModel())
+    message, name = engine.invoke("prompt", tier="standard")
+    assert name == "gemini-2.5-pro"
@@ -0,0 +1,45 @@
+"""Replay chat and image models: recorded outputs, simulated failures, separate storage."""
+import replay_models
+from gamemodule.code_fences import FencedOutputExtractor
+from imagemodule.storyboard import generate_storyboard_images
+from replay_models import ReplayChatModel, ReplayImageModel, ReplayTiming, data_path
+
+GAME = "<!DOCTYPE html>\n<html>\n<body>\n<canvas></canvas>\n<script>\nlet score = 0;\n</script>\n</body>\n</html>\n"
+SCENES = [{"index": 1, "title": "", "prompt": "A misty forest."}, {"index": 2, "title": "", "prompt": "A castle."}]
+
+
+def test_replay_chat_stream_round_trips_through_extractor():
+    model = ReplayChatModel(responses=["```html\n" + GAME + "```"], timing=ReplayTiming(median=0))
+    extractor = FencedOutputExtractor()
+    chunks = list(model.stream("Write an html game"))
+    streamed = "".join(extractor.feed(chunk.content) for chunk in chunks) + extractor.flush()
+    assert streamed == extractor.finish() == GAME
+    # Usage arrives on the final chunk only, as with Gemini.
+    assert [chunk.usage_metadata is not None for chunk in chunks] == [False] * (len(chunks) - 1) + [True]
+
+
+def test_replay_chat_answers_the_same_prompt_the_same_way():
+    model = ReplayChatModel(responses=["a", "b", "c", "d"], timing=ReplayTiming(median=0))
+    assert len({model.invoke("same prompt").content for _ in range(5)}) == 1
+
+
+def test_replay_image_model_copies_recorded_scenes(tmp_path):
+    recorded = tmp_path / "scene_1.png"
+    recorded.write_bytes(b"recorded scene")
+    model = ReplayImageModel(scenes=[str(recorded)], timing=ReplayTiming(median=0))
+    results = generate_storyboard_images(SCENES, model, output_dir=str(tmp_path / "out"))
+    assert all(r["error"] is None for r in results)
+    assert {open(r["path"], "rb").read() for r in results} == {b"recorded scene"}
+
+
+def test_replay_failures_are_reported_per_scene(tmp_path):
+    model = ReplayImageModel(scenes=[], timing=ReplayTiming(median=0, error_rate=1.0, seed=1))
+    results = generate_storyboard_images(SCENES, model, output_dir=str(tmp_path))
+    assert all(r["path"] is None and r["error"].split(": ", 1)[1] in replay_models.ERRORS for r in results)
+
+
+def test_replay_runs_keep_their_data_apart(monkeypatch):
+    monkeypatch.delenv("REPLAY_MODELS", raising=False)
+    assert data_path("/real/cache", "game_cache") == "/real/cache"
+    monkeypatch.setenv("REPLAY_MODELS", "1")
+    assert data_path("/real/cache", "game_cache").startswith(replay_models.REPLAY_DATA_DIR)
@@ -0,0 +1,55 @@
+"""Storyboard parsing and concurrent scene generation, on the offline stub model."""
+from imagemodule.storyboard import StubImageModel, generate_storyboard_images, parse_storyboard
+
+STORYBOARD = """
+Scene 1: The Woods
+Narrative:
+Lia enters the woods.
+
+Image Prompt:
+A misty pastel forest.
+
+Scene 2: The Prince
+Image Prompt:
+A boy floating above a crystal ground.
+
+Final Scene: Home
+Image Prompt:
+Lia holds a glowing scroll.
+"""
+
+
+def test_parse_storyboard_numbers_final_scene_last():
+    scenes = parse_storyboard(STORYBOARD)
+    assert [(scene["index"], scene["title"]) for scene in scenes] == [(1, "The Woods"), (2, "The Prince"), (3, "Home")]
+    assert scenes[0]["prompt"] == "A misty pastel forest."
+
+
+def test_stub_image_model_writes_one_png_per_scene(tmp_path):
+    scenes = parse_storyboard(STORYBOARD)
+    model = StubImageModel()
+    results = generate_storyboard_images(scenes, model, output_dir=str(tmp_path), max_workers=2)
+    assert [r["error"] for r in results] == [None, None, None]
+    assert sorted(model.calls) == sorted(scene["prompt"] for scene in scenes)
+    for result in results:
+        with open(result["path"], "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_stub_image_model_is_deterministic():
+    first = StubImageModel().generate_images("a forest")[0]
+    again = StubImageModel().generate_images("a forest")[0]
+    other = StubImageModel().generate_images("a castle")[0]
+    assert first.color == again.color != other.color
+
+
+def test_failed_scene_does_not_abort_the_run(tmp_path):
+    class FlakyModel(StubImageModel):
+        def generate_images(self, prompt, number_of_images=1, **kwargs):
+            if "crystal" in prompt:
+                raise RuntimeError("503 The service is currently unavailable.")
+            return super().generate_images(prompt, number_of_images, **kwargs)
+
+    results = generate_storyboard_images(parse_storyboard(STORYBOARD), FlakyModel(), output_dir=str(tmp_path))
+    assert [r["path"] is None for r in results] == [False, True, False]
+    assert "503" in results[1]["error"]
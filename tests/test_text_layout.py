@@ -0,0 +1,28 @@
+"""text_layout.wrap_text with a fixed-width stand-in for a pygame font."""
+from text_layout import clear_caches, split_word, wrap_text
+
+
+class FakeFont:
+    """Ten pixels per character, like a monospaced pygame font."""
+
+    def size(self, text):
+        return len(text) * 10, 20
+
+
+def test_wrap_text_fits_lines_and_keeps_paragraphs():
+    clear_caches()
+    lines = wrap_text("the quick brown fox jumps\n\nover the dog", FakeFont(), 100)
+    assert lines == ("the quick", "brown fox", "jumps", "", "over the", "dog")
+    assert all(len(line) * 10 <= 100 for line in lines)
+
+
+def test_wrap_text_splits_words_longer_than_a_line():
+    clear_caches()
+    assert wrap_text("a abcdefghijkl b", FakeFont(), 50) == ("a", "abcde", "fghij", "kl b")
+    assert split_word("abcdefg", FakeFont(), 5) == list("abcdefg")
+
+
+def test_wrap_text_is_cached():
+    clear_caches()
+    font = FakeFont()
+    assert wrap_text("some words here", font, 80) is wrap_text("some words here", font, 80)
@@ -0,0 +1,91 @@
+"""Word wrapping for pygame text with cached measurements.
+
+Works with any font that has size(text) -> (width, height), so pygame is
+only needed by the caller. Line widths are summed from cached word and
+space widths rather than measured whole, which can differ from a full
+render by a pixel or so of kerning.
+"""
+import bisect
+import itertools
+
+LAYOUT_CACHE_SIZE = 512
+
+_word_widths = {}  # font -> {word: width in pixels}
+_layouts = {}  # (text, font, max_width) -> tuple of lines
+
+
+def _measure(font, word):
+    widths = _word_widths.get(font)
+    if widths is None:
+        widths = _word_widths[font] = {}
+    width = widths.get(word)
+    if width is None:
+        width = widths[word] = font.size(word)[0]
+    return width
+
+
+def split_word(word, font, max_width):
+    """Break a word wider than max_width into pieces that each fit (at least one character per piece)."""
+    pieces = []
+    while word:
+        lo, hi = 1, len(word)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if font.size(word[:mid])[0] <= max_width:
+                lo = mid
+            else:
+                hi = mid - 1
+        pieces.append(word[:lo])
+        word = word[lo:]
+    return pieces
+
+
+def _break_lines(words, widths, space, max_width, lines):
+    # ends[k] is the width of words[:k] with a space after every word, so the
+    # longest line starting at `start` is found by binary search.
+    ends = list(itertools.accumulate((width + space for width in widths), initial=0))
+    start = 0
+    while start < len(words):
+        stop = max(start + 1, bisect.bisect_right(ends, ends[start] + max_width + space, lo=start + 1) - 1)
+        lines.append(" ".join(words[start:stop]))
+        start = stop
+
+
+def _layout(text, font, max_width):
+    space = _measure(font, " ")
+    lines = []
+    for paragraph in text.split("\n"):
+        words, widths = [], []
+        for word in paragraph.split():
+            width = _measure(font, word)
+            if width > max_width:
+                # Too long for any line: flush, then give it lines of its own.
+                _break_lines(words, widths, space, max_width, lines)
+                pieces = split_word(word, font, max_width)
+                lines.extend(pieces[:-1])
+                word, width = pieces[-1], _measure(font, pieces[-1])
+                words, widths = [], []
+            words.append(word)
+            widths.append(width)
+        if words:
+            _break_lines(words, widths, space, max_width, lines)
+        else:
+            lines.append("")
+    return tuple(lines)
+
+
+def wrap_text(text, font, max_width):
+    """Lines of `text` that each fit in max_width pixels in `font`; newlines start paragraphs."""
+    key = (text, font, max_width)
+    lines = _layouts.get(key)
+    if lines is None:
+        lines = _layout(text, font, max_width)
+        if len(_layouts) >= LAYOUT_CACHE_SIZE:
+            _layouts.pop(next(iter(_layouts)))
+        _layouts[key] = lines
+    return lines
+
+
+def clear_caches():
+    _word_widths.clear()
+    _layouts.clear()